@@ -6,6 +6,8 @@ import pandas as pd
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
+from permeability import wellpath_productivity
+
 
 st.title('2D Anisotropic Permability')
 st.sidebar.title('Inputs')
@@ -55,3 +57,26 @@ if b:  #tells if the button is pressed
     
     #st.pyplot(fig)
       #for showing the fig in app    
+
+
+# Wells drilled at every inclination through a 100 ft layer: permeability
+# normal to the wellbore and productivity relative to a vertical well
+w = st.button('Show Effective Permeability along the Wellpath')
+
+if w:
+    inc = np.linspace(0, 85, 86)[:, None]
+    s = np.linspace(0, 1, 2)
+    tvd = 100 * s
+    md = tvd / np.cos(np.radians(inc))
+    wp = wellpath_productivity(md, np.broadcast_to(inc, md.shape), kh, kt, tvd=tvd, top=0, base=100)
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Effective Permeability', 'Productivity Ratio'))
+    fig.add_trace(go.Scatter(x=inc[:, 0], y=wp['k_eff'][:, 0], mode='lines', name='k_eff',
+                             hovertemplate='Inclination: %{x}<br>k_eff: %{y}'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=inc[:, 0], y=wp['productivity_ratio'], mode='lines', name='J/J_vertical',
+                             hovertemplate='Inclination: %{x}<br>J/J_vertical: %{y}'), row=1, col=2)
+    fig.update_xaxes(title_text='Well Inclination (degrees)')
+    fig.update_yaxes(title_text='k_eff (md)', row=1, col=1)
+    fig.update_yaxes(title_text='J/J_vertical', row=1, col=2)
+    fig.update_layout(hovermode='closest')
+    st.plotly_chart(fig)
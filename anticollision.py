@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Anti-collision scan of one wellpath against many offset wells.  Every
+# offset well gets its own KD-tree, and one nearest-neighbour query of all
+# reference stations, bounded by the scan radius, gives the closest station
+# of that well to each reference station.  Memory stays at one result per
+# reference station and offset well, however many stations lie within the
+# radius.
+#
+# The separation factor uses a simple cone of uncertainty: the error radius
+# of a station is error_rate (ft per 1000 ft) times its MD, and
+#     SF = centre-to-centre distance / (error radius ref + error radius offset)
+
+
+def plan_to_neu(path, azimuth, north=0.0, east=0.0):
+    # Place a 2D planned profile (trajectory.evaluate output) in 3D along the
+    # given azimuth (deg) from the surface location.
+    az = np.radians(azimuth)
+    return {
+        'md': path['md'],
+        'north': north + path['h'] * np.cos(az),
+        'east': east + path['h'] * np.sin(az),
+        'tvd': path['tvd'],
+    }
+
+
+def _xyz(stations):
+    return np.column_stack((stations['north'], stations['east'], stations['tvd']))
+
+
+def scan(reference, offsets, scan_radius=1000.0, error_rate=2.5):
+    # reference: mapping with md/north/east/tvd arrays (one well).
+    # offsets: DataFrame of all offset stations with well/md/north/east/tvd.
+    # Returns one row per reference station and offset well that comes
+    # within scan_radius, with the closest approach and separation factor.
+    ref_md = np.asarray(reference['md'], dtype=float)
+    ref_xyz = _xyz(reference)
+    off_md = offsets['md'].to_numpy(dtype=float)
+    off_xyz = _xyz(offsets)
+    wells, well_code = np.unique(offsets['well'].to_numpy(), return_inverse=True)
+    order = np.argsort(well_code, kind='stable')
+    bounds = np.searchsorted(well_code[order], np.arange(len(wells) + 1))
+
+    i, j, d, code = [], [], [], []
+    for c in range(len(wells)):
+        stations = order[bounds[c]:bounds[c + 1]]
+        dist, nearest = cKDTree(off_xyz[stations]).query(ref_xyz, k=1, distance_upper_bound=scan_radius)
+        close = np.flatnonzero(np.isfinite(dist))
+        i.append(close)
+        j.append(stations[nearest[close]])
+        d.append(dist[close])
+        code.append(np.full(len(close), c))
+    i, j, d, code = (np.concatenate(a) if a else np.array([], dtype=int) for a in (i, j, d, code))
+    d = d.astype(float)
+
+    # One row per (reference station, offset well), ordered by station
+    rows = np.lexsort((code, i))
+    i, j, d, code = i[rows], j[rows], d[rows], code[rows]
+
+    error = error_rate / 1000 * (ref_md[i] + off_md[j])
+    with np.errstate(divide='ignore'):
+        sf = np.where(error > 0, d / error, np.inf)
+    return pd.DataFrame({
+        'md': ref_md[i],
+        'well': wells[code],
+        'offset_md': off_md[j],
+        'distance': d,
+        'separation_factor': sf,
+    })
+
+
+def summary(scan_table):
+    # Closest approach and minimum separation factor per offset well
+    closest = scan_table.loc[scan_table.groupby('well')['distance'].idxmin()]
+    min_sf = scan_table.groupby('well')['separation_factor'].min()
+    return (closest.set_index('well')
+            .assign(min_separation_factor=min_sf)
+            .sort_values('min_separation_factor')
+            .reset_index())
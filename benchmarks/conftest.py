@@ -0,0 +1,99 @@
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+import synthetic
+
+# Session fixtures for the synthetic datasets (synthetic.py) and the measure
+# fixture.  Every benchmark reports, next to the pytest-benchmark timings,
+# the throughput (items per second of the mean round) and the peak memory
+# allocated during one extra, untimed call traced with tracemalloc.  Both
+# are stored in extra_info, so they are part of the saved JSON runs.
+
+RESULTS = []
+
+
+@pytest.fixture(scope='session')
+def profiles():
+    return synthetic.profiles()
+
+
+@pytest.fixture(scope='session')
+def production():
+    return synthetic.production_table()
+
+
+@pytest.fixture(scope='session')
+def production_files(production, tmp_path_factory):
+    folder = tmp_path_factory.mktemp('production')
+    csv, parquet = folder / 'production.csv', folder / 'production.parquet'
+    production.to_csv(csv, index=False)
+    production.to_parquet(parquet, index=False)
+    return {'csv': str(csv), 'parquet': str(parquet)}
+
+
+@pytest.fixture(scope='session')
+def gauge():
+    return synthetic.gauge()
+
+
+@pytest.fixture(scope='session')
+def multirate_gauge():
+    return synthetic.multirate_gauge()
+
+
+@pytest.fixture(scope='session')
+def gauge_files(gauge, tmp_path_factory):
+    # N_GAUGE_FILES raw gauge CSVs with their parameter table, for run_batch
+    folder = tmp_path_factory.mktemp('gauges')
+    t, p = gauge
+    paths = []
+    for i in range(synthetic.N_GAUGE_FILES):
+        path = folder / f'test{i}.csv'
+        noisy = p + synthetic.gauge_noise(len(p), synthetic.SEED + 10 + i)
+        pd.DataFrame({'t (hours)': t, 'pwf (psi)': noisy}).to_csv(path, index=False)
+        paths.append(str(path))
+    parameters = pd.DataFrame([{'test': f'test{i}', **synthetic.GAUGE} for i in range(synthetic.N_GAUGE_FILES)])
+    return paths, parameters
+
+
+@pytest.fixture
+def measure(benchmark):
+    # measure(func, *args, items=..., unit=..., rounds=None, **kwargs) times
+    # func with pytest-benchmark (a fixed number of rounds for slow kernels)
+    # and records throughput and peak memory
+    def run(func, *args, items, unit, rounds=None, **kwargs):
+        if rounds is None:
+            result = benchmark(func, *args, **kwargs)
+        else:
+            result = benchmark.pedantic(func, args, kwargs, rounds=rounds, iterations=1)
+
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        stats = getattr(benchmark.stats, 'stats', None)
+        throughput = items / stats.mean if stats is not None and stats.mean > 0 else float('nan')
+        benchmark.extra_info.update({
+            'items': items,
+            'unit': unit,
+            'throughput': throughput,
+            'peak_memory_mb': peak / 2 ** 20,
+        })
+        RESULTS.append((benchmark.name, items, unit, throughput, peak / 2 ** 20))
+        return result
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    terminalreporter.section('throughput and peak memory')
+    width = max(len(name) for name, *_ in RESULTS)
+    terminalreporter.write_line(f'{"benchmark":<{width}}  {"items":>9}  {"throughput":>22}  {"peak (MiB)":>10}')
+    for name, items, unit, throughput, peak in RESULTS:
+        terminalreporter.write_line(f'{name:<{width}}  {items:>9,}  {throughput:>14,.0f} {unit + "/s":<7}  {peak:>10.1f}')
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+import trajectory as traj
+from welltest import storage_skin_model
+
+# Fixed synthetic datasets shared by the benchmarks.  Everything is seeded,
+# so timings from different commits are measured on identical inputs.
+
+SEED = 20_000
+
+# Planned profiles of about 20,000 ft MD each
+PROFILES = {
+    'build_hold': (traj.build_hold, (2000, 12000, 14600, 3.0)),
+    'build_hold_drop': (traj.build_hold_drop, (2000, 15000, 11800, 13000, 3.0, 2.0, 20.0)),
+    'slanted': (traj.slanted, (500, 13100, 14950, 20.0, 2.0)),
+    'horizontal_single': (traj.horizontal_single, (9000, 11400, 10400)),
+    'horizontal_double': (traj.horizontal_double, (2000, 8000, 14700, 9700, 30.0, 3.0)),
+}
+
+N_WELLS = 5_000
+N_MONTHS = 60
+
+# Gauge data: 72 hours at 1 s of a drawdown with storage and skin, and a
+# multi-rate test of the same well
+GAUGE = {'q': 500.0, 'Bo': 1.3, 'vis': 0.5, 'h': 50.0, 'phi': 0.2, 'ct': 1.6e-5, 'rw': 0.35, 'p0': 3500.0}
+ROCK = {k: GAUGE[k] for k in ('q', 'Bo', 'vis', 'h', 'phi', 'ct', 'rw')}
+GAUGE_MODEL = {'k': 20.0, 'C': 0.01, 'S': 2.0}
+GAUGE_HOURS = 72
+STEP_TIMES = [0.0, 12.0, 24.0, 36.0, 48.0, 60.0]
+STEP_RATES = [500.0, 300.0, 700.0, 400.0, 600.0, 0.0]
+N_GAUGE_FILES = 4
+
+
+def profiles():
+    return {name: func(*args)['stations'] for name, (func, args) in PROFILES.items()}
+
+
+def production_table():
+    # Long-format monthly history (well_id, date, rate) of N_WELLS hyperbolic
+    # wells with log-normal noise, 5 % of the months shut in
+    rng = np.random.default_rng(SEED)
+    qi = rng.uniform(200, 2000, N_WELLS)
+    di = rng.uniform(0.3, 2.0, N_WELLS)
+    b = rng.uniform(0.1, 1.5, N_WELLS)
+    t = np.arange(N_MONTHS) / 12
+    rate = qi[:, None] / (1 + b[:, None] * di[:, None] * t) ** (1 / b[:, None])
+    rate *= rng.lognormal(0, 0.05, rate.shape)
+    rate[rng.random(rate.shape) < 0.05] = 0.0
+    first = np.datetime64('2015-01', 'M') + rng.integers(0, 48, N_WELLS)
+    dates = first[:, None] + np.arange(N_MONTHS)
+    return pd.DataFrame({
+        'well_id': np.repeat([f'W{i:05d}' for i in range(N_WELLS)], N_MONTHS),
+        'date': dates.ravel().astype('datetime64[ns]'),
+        'rate': rate.ravel(),
+    })
+
+
+def decline_parameters():
+    # Seeded hyperbolic qi, di, b of N_WELLS wells for the forecast kernels
+    rng = np.random.default_rng(SEED)
+    return rng.uniform(200, 2000, N_WELLS), rng.uniform(0.3, 2.0, N_WELLS), rng.uniform(0.1, 1.5, N_WELLS)
+
+
+def gauge_noise(n, seed):
+    return np.random.default_rng(seed).normal(0, 0.01, n)
+
+
+def gauge_times():
+    return np.arange(1, GAUGE_HOURS * 3600 + 1) / 3600
+
+
+def gauge():
+    # (t hours, pwf psi) of the single-rate drawdown
+    t = gauge_times()
+    del_p, _ = storage_skin_model(t, **GAUGE_MODEL, **ROCK)
+    return t, GAUGE['p0'] - del_p + gauge_noise(len(t), SEED)
+
+
+def multirate_gauge():
+    # (t hours, pwf psi) of the STEP_TIMES/STEP_RATES history, by superposing
+    # the unit-rate response of every rate change
+    t = gauge_times()
+    unit, _ = storage_skin_model(t, **GAUGE_MODEL, **dict(ROCK, q=1.0))
+    p = np.full(len(t), GAUGE['p0'])
+    for T, dq in zip(STEP_TIMES, np.diff(STEP_RATES, prepend=0.0)):
+        n = np.searchsorted(t, T, side='right')
+        p[n:] -= dq * np.interp(t[n:] - T, t, unit, left=0.0)
+    return t, p + gauge_noise(len(t), SEED + 1)
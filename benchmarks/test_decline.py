@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from decline import (MODELS, cumulative_modified_hyperbolic, eur, fit_decline_model, fit_well_stream,
+                     hyperbolic_decline, modified_hyperbolic, monte_carlo_forecast)
+from production import iter_wells
+from synthetic import SEED, decline_parameters
+from typecurve import type_curve
+
+# Decline-curve kernels behind dc.py and dca.py on the 5,000-well table
+
+FORECAST_MONTHS = 361
+
+
+@pytest.fixture(scope='session')
+def wells(production_files):
+    # (well_id, t years, q) of every well, as the batch fitter receives them
+    return list(iter_wells(production_files['csv']))
+
+
+@pytest.fixture(scope='session')
+def fitted():
+    return decline_parameters()
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_fit_decline_model(measure, wells, model):
+    # One well, the fit dc.py runs per model on an upload
+    _, t, q = wells[0]
+    keep = q > 0
+    measure(fit_decline_model, t[keep], q[keep], MODELS[model], items=1, unit='fits')
+
+
+def test_fit_well_stream(measure, wells):
+    # All three models for every well, in-process
+    measure(lambda: fit_well_stream(iter(wells), workers=1), items=len(wells), unit='wells', rounds=3)
+
+
+def test_fit_well_stream_robust(measure, wells):
+    subset = wells[:500]
+    measure(lambda: fit_well_stream(iter(subset), workers=1, robust=True), items=len(subset), unit='wells',
+            rounds=3)
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_iter_wells(measure, production, production_files, fmt):
+    path = production_files[fmt]
+    measure(lambda: sum(1 for _ in iter_wells(path)), items=len(production), unit='rows', rounds=3)
+
+
+def test_type_curve(measure, production):
+    measure(type_curve, production, items=len(production), unit='rows', rounds=5)
+
+
+def test_forecast(measure, fitted):
+    # Rate and cumulative of every well on a monthly grid, as dca.py forecast
+    qi, di, b = fitted
+    t = np.arange(FORECAST_MONTHS)[:, None] / 12
+
+    def forecast():
+        return modified_hyperbolic(t, qi, di, b, 0.06), cumulative_modified_hyperbolic(qi, di, b, 0.06, t)
+
+    measure(forecast, items=len(qi) * len(t), unit='values')
+
+
+def test_eur(measure, fitted):
+    qi, di, b = fitted
+    measure(eur, qi, di, b, 0.06, 5.0, 50.0, items=len(qi), unit='wells')
+
+
+def test_monte_carlo_forecast(measure, wells):
+    _, t, q = wells[0]
+    keep = q > 0
+    params, cov = fit_decline_model(t[keep], q[keep], hyperbolic_decline, return_cov=True)
+    months = np.arange(FORECAST_MONTHS) / 12
+    measure(monte_carlo_forecast, months, params, cov, n=100_000, seed=SEED, items=100_000 * len(months),
+            unit='values', rounds=3)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import permeability
+import survey
+import sweep
+import trajectory as traj
+from synthetic import PROFILES
+
+# Planned-profile kernels behind directional_drilling.py, on 20,000 ft wells
+
+
+@pytest.mark.parametrize('name', PROFILES)
+def test_build_profile(measure, name):
+    func, args = PROFILES[name]
+    measure(func, *args, items=1, unit='plans')
+
+
+@pytest.mark.parametrize('name', PROFILES)
+def test_evaluate_every_foot(measure, profiles, name):
+    st = profiles[name]
+    md = traj.md_grid(st)
+    measure(traj.evaluate, st, md, items=len(md), unit='ft')
+
+
+@pytest.mark.parametrize('name', PROFILES)
+def test_evaluate_adaptive(measure, profiles, name):
+    # As the Streamlit pages plot a profile: adaptive sampling, then evaluate
+    st = profiles[name]
+    md = traj.adaptive_md(st)
+    measure(lambda: traj.evaluate(st, traj.adaptive_md(st)), items=len(md), unit='points')
+
+
+@pytest.mark.parametrize('name', PROFILES)
+def test_minimum_curvature(measure, profiles, name):
+    # A 1 ft survey of the planned well
+    path = traj.evaluate(profiles[name], traj.md_grid(profiles[name]))
+    azi = np.full(len(path), 45.0)
+    measure(survey.minimum_curvature, path['md'], path['inc'], azi, items=len(path), unit='ft')
+
+
+@pytest.mark.parametrize('name', PROFILES)
+def test_wellpath_productivity(measure, profiles, name):
+    path = traj.evaluate(profiles[name], traj.md_grid(profiles[name]))
+    measure(permeability.wellpath_productivity, path['md'], path['inc'], 200.0, 20.0, tvd=path['tvd'],
+            items=len(path), unit='ft')
+
+
+def test_sweep_build_hold_drop(measure):
+    axes = (np.linspace(1, 5, 40), np.linspace(1, 5, 40), np.linspace(500, 5000, 25), np.linspace(0, 40, 25))
+    measure(sweep.sweep_build_hold_drop, 15000, 11800, 13000, *axes, workers=1,
+            items=np.prod([len(a) for a in axes]), unit='plans')
+
+
+def test_sweep_horizontal_double(measure):
+    axes = (np.linspace(1, 5, 100), np.linspace(500, 5000, 100), np.linspace(5, 85, 100))
+    measure(sweep.sweep_horizontal_double, 8000, 14700, 9700, *axes, workers=1,
+            items=np.prod([len(a) for a in axes]), unit='plans')
@@ -0,0 +1,45 @@
+from superposition import equivalent_time, period_table
+from synthetic import GAUGE, ROCK, STEP_RATES, STEP_TIMES
+from welltest import analyze_table, analyze_test, derivative_table, match_storage_skin, run_batch
+
+# Well-test kernels on 72 hours of 1 s gauge data (259,200 samples per test)
+
+
+def test_derivative_table(measure, gauge):
+    t, p = gauge
+    measure(derivative_table, t, p, GAUGE['p0'], items=len(t), unit='samples')
+
+
+def test_analyze_table(measure, gauge):
+    # Straight-line interpretation of the log-resampled table
+    table = derivative_table(gauge[0], gauge[1], GAUGE['p0'])
+    measure(analyze_table, table, **ROCK, items=len(table), unit='points')
+
+
+def test_match_storage_skin(measure, gauge):
+    table = derivative_table(gauge[0], gauge[1], GAUGE['p0'])
+    measure(match_storage_skin, table['t (hours)'], table['del_p'], table['ddp/dlnt'], **ROCK,
+            items=len(table), unit='points')
+
+
+def test_analyze_test(measure, gauge):
+    # Raw gauge data to straight-line and type-curve results
+    t, p = gauge
+    measure(analyze_test, t, p, **ROCK, p0=GAUGE['p0'], match=True, items=len(t), unit='samples', rounds=5)
+
+
+def test_equivalent_time(measure, multirate_gauge):
+    t, _ = multirate_gauge
+    measure(equivalent_time, t, STEP_TIMES, STEP_RATES, items=len(t), unit='samples', rounds=5)
+
+
+def test_period_table(measure, multirate_gauge):
+    t, p = multirate_gauge
+    measure(period_table, t, p, STEP_TIMES, STEP_RATES, items=len(t), unit='samples', rounds=5)
+
+
+def test_run_batch(measure, gauge, gauge_files):
+    # Reading and interpreting whole gauge files, in-process
+    paths, parameters = gauge_files
+    measure(run_batch, paths, parameters, workers=1, items=len(paths) * len(gauge[0]), unit='samples',
+            rounds=3)
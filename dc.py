@@ -1,34 +1,26 @@
+import io
+
 import streamlit as st
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-from scipy.optimize import curve_fit
-
-# Function to fit data to decline models
-def fit_decline_model(t, q, model_func, p0):
-    params, _ = curve_fit(model_func, t, q, p0=p0)
-    return params
 
-# Function to define decline curve models
-def exponential_decline(t, qi, di):
-    return qi * np.exp(-di * t)
+from decline import (fit_decline_model, fit_decline_model_cached, fit_decline_model_robust, fit_well_stream, monte_carlo_forecast, prepare_history, exponential_decline, hyperbolic_decline, harmonic_decline,
+                     cumulative_exponential, cumulative_hyperbolic, cumulative_harmonic, cumulative_modified_hyperbolic,
+                     eur, modified_hyperbolic)
+from production import elapsed_years, iter_chunks, iter_wells
+from typecurve import fit_type_curve, type_curve
 
-def hyperbolic_decline(t, qi, di, b):
-    return qi / ((1 + b * di * t) ** (1 / b))
 
-def harmonic_decline(t, qi, di):
-    return qi / (1 + di * t)
+@st.cache_data(show_spinner='Fitting the decline models to every well...')
+def fit_uploaded_wells(content, name, time_col, robust):
+    # Batch fit of an uploaded multi-well file, cached on its bytes and the
+    # robust flag so that reruns (checkboxes, downloads) do not refit
+    source = io.BytesIO(content)
+    source.name = name
+    return fit_well_stream(iter_wells(source, time_col=time_col), robust=robust)
 
-# Define the cumulative production functions
-def cumulative_exponential(qi,di,t):
-    return (qi/di)*(1-np.exp(-di*t))
-def cumulative_hyperbolic(qi,di,b,t):
-    if b ==0:
-        return cumulative_exponential(qi,di,t)
-    return (qi / ((1 - b) * di)) * (1 - (1 / ((1 + b * di * t) ** ((1 - b) / b))))
-def cumulative_harmonic(qi,di,t):
-    return (qi/di)*(np.log(1+di*t))
 
 # Initialize session state for navigation
 if 'page' not in st.session_state:
@@ -68,6 +60,8 @@ elif st.session_state.page == 'input_parameters':
         di = st.sidebar.number_input('Decline Rate (di)', value=0.1, min_value=0.0)
         b = st.sidebar.number_input('Hyperbolic Decline Constant (b)', value=0.5, min_value=0.0)
         time_period = st.sidebar.number_input('Time Period (years)', value=10, min_value=1, step=1)
+        dmin = st.sidebar.number_input('Terminal Decline Rate (Dmin, 0 = none)', value=0.0, min_value=0.0)
+        q_limit = st.sidebar.number_input('Economic Limit Rate', value=0.0, min_value=0.0)
         
 
         # Generate time data
@@ -75,13 +69,17 @@ elif st.session_state.page == 'input_parameters':
 
     # Calculate production rates using each method
         exp_production = exponential_decline(t, qi, di)
-        hyp_production = hyperbolic_decline(t, qi, di, b)
+        hyp_production = hyperbolic_decline(t, qi, di, b) if dmin == 0 else modified_hyperbolic(t, qi, di, b, dmin)
         har_production = harmonic_decline(t, qi, di)
 
     # Calculate cumulative production using each method
         exp_cumulative = cumulative_exponential(qi, di, t)
-        hyp_cumulative = cumulative_hyperbolic(qi, di, b, t)
+        hyp_cumulative = cumulative_hyperbolic(qi, di, b, t) if dmin == 0 else cumulative_modified_hyperbolic(qi, di, b, dmin, t)
         har_cumulative = cumulative_harmonic(qi, di, t)
+
+    # EUR to the economic limit or the end of the time period
+        eur_values = {name: eur(qi, di, b_value, d_term, q_limit, time_period) for name, b_value, d_term in
+                      (('Exponential', 0.0, 0.0), ('Hyperbolic', b, dmin), ('Harmonic', 1.0, 0.0))}
     #show button
         b = st.button('Show Reservoir Performance Analysis')
         if b:
@@ -149,8 +147,13 @@ elif st.session_state.page == 'input_parameters':
             st.write('### Harmonic Decline')
             st.write(pd.DataFrame({'Time (years)': t, 'Production Rate': har_production, 'Cumulative Production': har_cumulative}))
 
+            st.subheader('Estimated Ultimate Recovery')
+            st.write(pd.DataFrame({'EUR': [float(v[0]) for v in eur_values.values()],
+                                   'Producing Life (years)': [float(v[1]) for v in eur_values.values()]},
+                                  index=list(eur_values)))
+
 elif st.session_state.page == 'upload_csv':
-    uploaded_file = st.file_uploader("Upload your 'time|rate' CSV file  \n*(#Uploaded file should contain first column titled as time and next as rate.)*", type=["csv"])
+    uploaded_file = st.file_uploader("Upload your 'time|rate' CSV file  \n*(#Uploaded file should contain first column titled as time and next as rate. A 'well_id|date|rate' production history of many wells, sorted by well, is fitted well by well.)*", type=["csv", "parquet"])
     if uploaded_file is not None:
         # Define a new future time range for the forecast
         #future_time_period = st.sidebar.number_input('Forecast Time Period (years)', value=10, min_value=1, step=1)
@@ -160,34 +163,65 @@ elif st.session_state.page == 'upload_csv':
         #if p:
             
         st.header('The Best Fit Model is shown as follows:')
-        data = pd.read_csv(uploaded_file)
+        data = next(iter_chunks(uploaded_file, chunksize=5))
+        uploaded_file.seek(0)
         st.write("Data Preview:")
-        st.write(data.head())
+        st.write(data)
+        robust = st.sidebar.checkbox('Robust Fit (skip shut-ins, outliers and restarts)')
+
+        if 'well_id' in data.columns:
+            # Long-format file with many wells: stream it in chunks, well by well, into the batch fitter
+            time_col = 'date' if 'date' in data.columns else 'time'
+            params = fit_uploaded_wells(uploaded_file.getvalue(), uploaded_file.name, time_col, robust)
+            st.subheader('Best Fit Model of every Well')
+            st.write(params[params['best']])
+            st.download_button('Download Fitted Parameters', params.to_csv(index=False), file_name='decline_parameters.csv')
+
+            if st.checkbox('Show Type Curve (P10/P50/P90)'):
+                # Wells aligned to first production, normalized to a 10,000 ft lateral if a lateral_length column is given
+                # (streamed in chunks of the needed columns)
+                lateral_col = 'lateral_length' if 'lateral_length' in data.columns else None
+                curve = type_curve(uploaded_file, time_col=time_col, lateral_col=lateral_col)
+                fig = go.Figure()
+                for level in ('P10', 'P50', 'P90'):
+                    fig.add_trace(go.Scatter(x=curve['time'], y=curve[level], mode='lines', name=f'{level} Type Curve'))
+                fig.update_layout(
+                    title='Type Curve',
+                    xaxis_title='Time since First Production (years)',
+                    yaxis_title='Production Rate (q)',
+                    hovermode='x unified',
+                    width = 1500,
+                    height = 500)
+                st.plotly_chart(fig)
+                st.subheader('Type Curve Decline Parameters')
+                st.write(fit_type_curve(curve))
+            st.stop()
+
+        data = pd.concat(iter_chunks(uploaded_file), ignore_index=True)
+        if 'time' not in data.columns and 'date' in data.columns:
+            data['time'] = elapsed_years(data['date'])
 
             # Assume the file has columns 'time' and 'rate'
         t = data['time'].values
         q = data['rate'].values
-
-            # Fit the data to each model
-        exp_params = fit_decline_model(t, q, exponential_decline, p0=[q[0], 0.1])
-        har_params = fit_decline_model(t, q, harmonic_decline, p0=[q[0], 0.1])
-        hyp_params = fit_decline_model(t, q, hyperbolic_decline, p0=[q[0], 0.1, 0.5])
-
-            # Calculate R-squared for each model
-        exp_residuals = q - exponential_decline(t, *exp_params)
-        exp_ss_res = np.sum(exp_residuals**2)
-        exp_ss_tot = np.sum((q - np.mean(q))**2)
-        exp_r2 = 1 - (exp_ss_res / exp_ss_tot)
-
-        har_residuals = q - harmonic_decline(t, *har_params)
-        har_ss_res = np.sum(har_residuals**2)
-        har_ss_tot = np.sum((q - np.mean(q))**2)
-        har_r2 = 1 - (har_ss_res / har_ss_tot)
-
-        hyp_residuals = q - hyperbolic_decline(t, *hyp_params)
-        hyp_ss_res = np.sum(hyp_residuals**2)
-        hyp_ss_tot = np.sum((q - np.mean(q))**2)
-        hyp_r2 = 1 - (hyp_ss_res / hyp_ss_tot)
+        loss = None
+        if robust:
+            # Fit the last decline segment only, with time counted from its start
+            t, q, t0 = prepare_history(t, q)
+            loss = 'soft_l1'
+            st.write(f"Fitted decline segment starts at t = {t0:.2f} years ({len(q)} of {len(data)} records used)")
+            if len(q) < 3:
+                st.error('Too few producing records are left after removing shut-ins to fit the decline models.')
+                st.stop()
+
+            # Fit the data to each model (served from the fit cache on reruns)
+        try:
+            exp_params, exp_r2 = fit_decline_model_cached(t, q, exponential_decline, loss=loss)
+            har_params, har_r2 = fit_decline_model_cached(t, q, harmonic_decline, loss=loss)
+            hyp_params, hyp_r2 = fit_decline_model_cached(t, q, hyperbolic_decline, loss=loss)
+        except (RuntimeError, ValueError, TypeError) as e:
+            st.error(f'The decline models could not be fitted to this data: {e}')
+            st.stop()
 
             # Determine the best fit model
         r2_values = {'Exponential': exp_r2, 'Harmonic': har_r2, 'Hyperbolic': hyp_r2}
@@ -223,6 +257,9 @@ elif st.session_state.page == 'upload_csv':
 
         # Define a new future time range for the forecast
         future_time_period = st.sidebar.number_input('Forecast Time Period (years)', value=10, min_value=1, step=1)
+        probabilistic = st.sidebar.checkbox('Probabilistic Forecast (P10/P50/P90)')
+        if probabilistic:
+            realizations = st.sidebar.number_input('Monte Carlo Realizations', value=100000, min_value=1000, step=10000)
         p = st.sidebar.button('Show Production Forecast')
         if p:
             future_t = np.linspace(t[-1], t[-1] + future_time_period, 100)
@@ -296,5 +333,35 @@ elif st.session_state.page == 'upload_csv':
             st.subheader('Cumulative Production Forecast Data')
             st.write(pd.DataFrame({'Future Time (years)': future_t, 'Forecast Cumulative Production': forecast_cumulative}))
 
+            if probabilistic:
+                # Sample the best fit model's parameters from the covariance of the same (robust) fit
+                best_func = {'Exponential': exponential_decline, 'Harmonic': harmonic_decline, 'Hyperbolic': hyperbolic_decline}[best_fit]
+                try:
+                    if robust:
+                        params, cov = fit_decline_model_robust(t, q, best_func, loss=loss, return_cov=True)
+                    else:
+                        params, cov = fit_decline_model(t, q, best_func, return_cov=True)
+                    mc = monte_carlo_forecast(future_t, params, cov, best_func, n=int(realizations))
+                except (RuntimeError, ValueError, TypeError) as e:
+                    st.error(f'The probabilistic forecast could not be computed: {e}')
+                    st.stop()
+
+                fig3 = go.Figure()
+                for level in ('P10', 'P50', 'P90'):
+                    fig3.add_trace(go.Scatter(x=future_t, y=mc['rate'][level], mode='lines', name=f'{level} Production Rate'))
+                fig3.update_layout(
+                    title=f'Probabilistic Production Forecast ({mc["realizations"]} realizations)',
+                    xaxis_title='Time (years)',
+                    yaxis_title='Production Rate (q)',
+                    hovermode='x unified',
+                    width = 1500,
+                    height = 500)
+                st.plotly_chart(fig3)
+
+                st.subheader('Estimated Ultimate Recovery')
+                st.write(pd.DataFrame({'EUR': mc['eur']}, index=['P10', 'P50', 'P90']))
+                st.write(pd.DataFrame({'Future Time (years)': future_t,
+                                       **{f'{level} Cumulative Production': mc['cumulative'][level] for level in ('P10', 'P50', 'P90')}}))
+
 
 
@@ -0,0 +1,95 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from decline import cumulative_modified_hyperbolic, eur, fit_well_stream, modified_hyperbolic
+from production import iter_chunks, iter_wells
+
+# Headless decline curve analysis for batch jobs, without the Streamlit UI:
+#
+#     python dca.py fit --input prod.parquet --out params.parquet --workers 16
+#     python dca.py forecast --input params.parquet --out forecast.parquet --years 30
+#
+# Files are CSV or Parquet (by extension).  The fit step streams a long-format
+# production history (well_id, date, rate) well by well into the batch
+# fitter; the forecast step evaluates the best model of every well in one
+# vectorized call.
+
+
+def _write(table, path):
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+def fit(args):
+    wells = iter_wells(args.input, args.well_col, args.time_col, args.rate_col, args.chunksize)
+    params = fit_well_stream(wells, args.workers, args.wells_per_task, args.cache_dir, args.robust)
+    _write(params, args.out)
+    print(f'{params["well_id"].nunique()} wells fitted, parameters written to {args.out}')
+
+
+def forecast(args):
+    params = pd.concat(iter_chunks(args.input), ignore_index=True)
+    if args.model is None:
+        params = params[params['best']]
+    else:
+        params = params[params['model'] == args.model]
+    params = params.dropna(subset=['qi', 'di', 'b'])
+
+    qi, di, b = (params[c].to_numpy(dtype=float) for c in ('qi', 'di', 'b'))
+    t = np.arange(0, args.years + 1e-9, args.step_months / 12)[:, None]
+    rate = modified_hyperbolic(t, qi, di, b, args.dmin)
+    cum = cumulative_modified_hyperbolic(qi, di, b, args.dmin, t)
+    table = pd.DataFrame({
+        'well_id': np.tile(params['well_id'].to_numpy(), len(t)),
+        'time': np.repeat(t[:, 0], len(params)),
+        'rate': rate.ravel(),
+        'cumulative': cum.ravel(),
+    }).sort_values(['well_id', 'time'], kind='stable')
+    _write(table, args.out)
+
+    if args.eur_out is not None:
+        well_eur, t_end = eur(qi, di, b, args.dmin, args.q_limit, args.years)
+        _write(pd.DataFrame({'well_id': params['well_id'].to_numpy(), 'model': params['model'].to_numpy(),
+                             'eur': well_eur, 'producing_life': t_end}), args.eur_out)
+    print(f'{params["well_id"].nunique()} wells forecast over {args.years} years, written to {args.out}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Decline curve analysis of production histories')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('fit', help='fit the decline models to every well of a production history')
+    p.add_argument('--input', required=True, help='production history (CSV or Parquet), one row per well and date')
+    p.add_argument('--out', required=True, help='fitted parameters (CSV or Parquet)')
+    p.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    p.add_argument('--well-col', default='well_id')
+    p.add_argument('--time-col', default='date')
+    p.add_argument('--rate-col', default='rate')
+    p.add_argument('--chunksize', type=int, default=500_000, help='rows read per chunk')
+    p.add_argument('--wells-per-task', type=int, default=100)
+    p.add_argument('--robust', action='store_true', help='skip shut-ins, outliers and restarts')
+    p.add_argument('--cache-dir', default=None, help='directory of cached fits shared between runs')
+    p.set_defaults(func=fit)
+
+    p = commands.add_parser('forecast', help='forecast rate, cumulative and EUR from fitted parameters')
+    p.add_argument('--input', required=True, help='parameters written by the fit command')
+    p.add_argument('--out', required=True, help='forecast table (CSV or Parquet)')
+    p.add_argument('--years', type=float, default=30.0)
+    p.add_argument('--step-months', type=float, default=1.0)
+    p.add_argument('--model', choices=['Exponential', 'Harmonic', 'Hyperbolic'], default=None,
+                   help='model to forecast with (default: best fit of every well)')
+    p.add_argument('--dmin', type=float, default=0.0, help='terminal decline rate (0 = none)')
+    p.add_argument('--q-limit', type=float, default=0.0, help='economic limit rate for the EUR')
+    p.add_argument('--eur-out', default=None, help='EUR table (CSV or Parquet)')
+    p.set_defaults(func=forecast)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
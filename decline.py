@@ -0,0 +1,642 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.optimize import curve_fit, least_squares, leastsq
+
+
+# Function to define decline curve models
+def exponential_decline(t, qi, di):
+    return qi * np.exp(-di * t)
+
+def hyperbolic_decline(t, qi, di, b):
+    return qi / ((1 + b * di * t) ** (1 / b))
+
+def harmonic_decline(t, qi, di):
+    return qi / (1 + di * t)
+
+# Define the cumulative production functions
+def cumulative_exponential(qi,di,t):
+    return (qi/di)*(1-np.exp(-di*t))
+def cumulative_hyperbolic(qi,di,b,t):
+    # Element-wise, so arrays of sampled (qi, di, b) can be broadcast against
+    # t.  b = 0 and b = 1 (where the general formula divides by zero) use the
+    # exponential and harmonic limits.
+    b = np.asarray(b, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hyp = (qi / ((1 - b) * di)) * (1 - (1 / ((1 + b * di * t) ** ((1 - b) / b))))
+    if np.any(b == 0):
+        hyp = np.where(b == 0, cumulative_exponential(qi,di,t), hyp)
+    harmonic = np.abs(b - 1) < 1e-9
+    if np.any(harmonic):
+        hyp = np.where(harmonic, cumulative_harmonic(qi,di,t), hyp)
+    return hyp
+def cumulative_harmonic(qi,di,t):
+    return (qi/di)*(np.log(1+di*t))
+
+
+# Modified hyperbolic, segmented forecasts and EUR cut-offs.  Everything is
+# closed form and element-wise: pass per-well arrays of qi, di, b, dmin
+# (shape (n,)) against a time column (shape (m, 1)) to forecast thousands
+# of wells in one call.  Declines are nominal, per year.
+def _arps_rate(t, qi, di, b):
+    # Arps rate for any b >= 0, including the exponential limit b = 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return np.where(b > 0, qi / (1 + b * di * t) ** (1 / np.where(b > 0, b, 1)), qi * np.exp(-di * t))
+
+
+def switch_time(di, b, dmin):
+    # Time at which the hyperbolic decline di/(1 + b*di*t) falls to the
+    # terminal decline dmin (0 if it starts below, inf if it never does)
+    di, b, dmin = (np.asarray(x, dtype=float) for x in (di, b, dmin))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_sw = (di / dmin - 1) / (b * di)
+    return np.where(di > dmin, np.where(b > 0, t_sw, np.inf), 0.0)
+
+
+def _switch(qi, di, b, dmin):
+    # Time, rate and decline at the switch to the exponential tail
+    t_sw = switch_time(di, b, dmin)
+    with np.errstate(invalid='ignore'):
+        q_sw = _arps_rate(t_sw, qi, di, b)
+        d_sw = di / (1 + b * di * t_sw)
+    return t_sw, q_sw, np.where(np.isfinite(t_sw), d_sw, dmin)
+
+
+def modified_hyperbolic(t, qi, di, b, dmin):
+    # Hyperbolic decline that turns exponential once the decline reaches dmin
+    t_sw, q_sw, d_sw = _switch(qi, di, b, dmin)
+    with np.errstate(invalid='ignore', over='ignore'):
+        tail = q_sw * np.exp(-d_sw * (t - t_sw))
+    return np.where(t < t_sw, _arps_rate(np.minimum(t, t_sw), qi, di, b), tail)
+
+
+def cumulative_modified_hyperbolic(qi, di, b, dmin, t):
+    t_sw, q_sw, d_sw = _switch(qi, di, b, dmin)
+    head = cumulative_hyperbolic(qi, di, b, np.minimum(t, t_sw))
+    with np.errstate(invalid='ignore'):
+        tail = cumulative_exponential(q_sw, d_sw, np.maximum(t - t_sw, 0))
+    return head + np.where(t > t_sw, tail, 0.0)
+
+
+def time_to_rate(qi, di, b, dmin, q):
+    # Time at which the modified hyperbolic rate falls to q (0 if qi <= q)
+    qi, di, b, q = (np.asarray(x, dtype=float) for x in (qi, di, b, q))
+    t_sw, q_sw, d_sw = _switch(qi, di, b, dmin)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = qi / q
+        head = np.where(b > 0, (ratio ** b - 1) / (b * di), np.log(ratio) / di)
+        tail = t_sw + np.log(q_sw / q) / d_sw
+    return np.where(qi <= q, 0.0, np.where(q >= q_sw, head, tail))
+
+
+def eur(qi, di, b, dmin=0.0, q_limit=0.0, t_limit=np.inf):
+    # Estimated ultimate recovery up to the economic-limit rate q_limit or
+    # the time limit t_limit, whichever comes first.  Returns (eur, t_end);
+    # eur is inf for b >= 1 without a terminal decline or cut-off.
+    t_end = np.minimum(time_to_rate(qi, di, b, dmin, q_limit), t_limit)
+    return cumulative_modified_hyperbolic(qi, di, b, dmin, t_end), t_end
+
+
+def segmented_forecast(t, qi, segments):
+    # Multi-segment forecast: segments is a sequence of (duration, di, b),
+    # each segment starting at the rate where the previous one ended.  The
+    # last duration may be np.inf.  Returns rate and cumulative at t.
+    rate = 0.0
+    cum = 0.0
+    t_start = 0.0
+    q_start = np.asarray(qi, dtype=float)
+    for duration, di, b in segments:
+        tau = np.clip(t - t_start, 0, duration)
+        inside = (t >= t_start) & (t < t_start + duration)
+        rate = np.where(inside, _arps_rate(tau, q_start, di, b), rate)
+        cum = cum + cumulative_hyperbolic(q_start, di, b, tau)
+        q_start = _arps_rate(duration, q_start, di, b)
+        t_start = t_start + duration
+    return rate, cum
+
+
+# Analytic Jacobians of the rate models, d q / d (qi, di[, b]) per time step
+def exponential_jacobian(t, qi, di):
+    e = np.exp(-di * t)
+    return np.column_stack((e, -qi * t * e))
+
+def hyperbolic_jacobian(t, qi, di, b):
+    u = 1 + b * di * t
+    q_qi = u ** (-1 / b)
+    q = qi * q_qi
+    return np.column_stack((q_qi, -qi * t * q_qi / u, q * (np.log(u) / b**2 - di * t / (b * u))))
+
+def harmonic_jacobian(t, qi, di):
+    u = 1 + di * t
+    return np.column_stack((1 / u, -qi * t / u**2))
+
+
+# Data-driven starting points: log-linear regression for exponential
+# (ln q = ln qi - di*t), 1/q regression for harmonic (1/q = 1/qi + di/qi*t),
+# and for hyperbolic the q**-b regression (q**-b = qi**-b + qi**-b*b*di*t)
+# of the b on HYPERBOLIC_B_GRID that best reproduces the rates.  Falls back
+# to the old fixed guess when the regression gives a non-physical answer.
+HYPERBOLIC_B_GRID = np.array([0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0])
+
+
+def _line(x, y):
+    # Least-squares slope and intercept of y = slope*x + intercept
+    x_mean, y_mean = x.mean(), y.mean()
+    slope = np.dot(x - x_mean, y - y_mean) / np.dot(x - x_mean, x - x_mean)
+    return slope, y_mean - slope * x_mean
+
+
+def _hyperbolic_guess(t, q):
+    # [qi, di, b] of the best grid b, or None when no b gives a physical line
+    b = HYPERBOLIC_B_GRID[:, None]
+    y = q ** -b
+    t_mean, y_mean = t.mean(), y.mean(axis=1, keepdims=True)
+    slope = ((t - t_mean) * (y - y_mean)).sum(axis=1, keepdims=True) / np.dot(t - t_mean, t - t_mean)
+    intercept = y_mean - slope * t_mean
+    with np.errstate(all='ignore'):
+        qi = intercept ** (-1 / b)
+        di = slope / (intercept * b)
+        sse = np.sum((qi / (1 + b * di * t) ** (1 / b) - q) ** 2, axis=1)
+    sse[~((intercept[:, 0] > 0) & (slope[:, 0] > 0) & np.isfinite(sse))] = np.inf
+    i = np.argmin(sse)
+    return [qi[i, 0], di[i, 0], b[i, 0]] if np.isfinite(sse[i]) else None
+
+
+def initial_guess(t, q, model_func):
+    t = np.asarray(t, dtype=float)
+    q = np.asarray(q, dtype=float)
+    positive = q > 0
+    default = [q[0], 0.1]
+    if positive.sum() >= 2 and np.ptp(t[positive]) > 0:
+        tp, qp = t[positive], q[positive]
+        if model_func is hyperbolic_decline:
+            guess = _hyperbolic_guess(tp, qp)
+            if guess is not None:
+                return guess
+        if model_func is exponential_decline:
+            slope, intercept = _line(tp, np.log(qp))
+            guess = [np.exp(intercept), -slope]
+        else:
+            slope, intercept = _line(tp, 1 / qp)
+            guess = [1 / intercept, slope / intercept] if intercept > 0 else default
+        if np.all(np.isfinite(guess)) and guess[0] > 0 and guess[1] > 0:
+            default = guess
+    if model_func is hyperbolic_decline:
+        return default + [0.5]
+    return default
+
+
+JACOBIANS = {
+    exponential_decline: exponential_jacobian,
+    hyperbolic_decline: hyperbolic_jacobian,
+    harmonic_decline: harmonic_jacobian,
+}
+
+# qi, di >= 0 and 0 < b <= 5 keep the hyperbolic power defined while fitting
+BOUNDS = {
+    exponential_decline: ([0, 0], [np.inf, np.inf]),
+    hyperbolic_decline: ([0, 0, 1e-6], [np.inf, np.inf, 5]),
+    harmonic_decline: ([0, 0], [np.inf, np.inf]),
+}
+
+
+CUMULATIVES = {
+    exponential_decline: cumulative_exponential,
+    hyperbolic_decline: cumulative_hyperbolic,
+    harmonic_decline: cumulative_harmonic,
+}
+
+
+def _fit_bounded(t, q, model_func, p0, return_cov):
+    # Trust-region refit within BOUNDS, for fits Levenberg-Marquardt cannot do
+    lower, upper = BOUNDS.get(model_func, (-np.inf, np.inf))
+    p0 = np.clip(p0, np.add(lower, 1e-12), upper)
+    params, pcov = curve_fit(model_func, t, q, p0=p0, jac=JACOBIANS.get(model_func, None), bounds=(lower, upper))
+    return (params, pcov) if return_cov else params
+
+
+def _fit_hyperbolic(t, q, p0, return_cov):
+    # Levenberg-Marquardt in (qi, di, u) with b = b_max / (1 + exp(-u)), so
+    # b stays inside the (0, b_max) bounds without a bounded solver.  A fit
+    # that fails, or ends on b_max or b ~ 0, is refitted with bounds.
+    b_max = BOUNDS[hyperbolic_decline][1][2]
+    qi, di, b = p0
+    b = np.clip(b, 1e-6, 0.999 * b_max)
+
+    def split(u):
+        return u[0], u[1], b_max / (1 + np.exp(-u[2]))
+
+    def residuals(u):
+        return hyperbolic_decline(t, *split(u)) - q
+
+    def jacobian(u):
+        qi, di, b = split(u)
+        return (hyperbolic_jacobian(t, qi, di, b) * [1, 1, b * (1 - b / b_max)]).T
+
+    with np.errstate(all='ignore'):
+        u, cov, _, _, ier = leastsq(residuals, [qi, di, np.log(b / (b_max - b))], Dfun=jacobian, col_deriv=True,
+                                    full_output=True)
+    params = np.array(split(u))
+    if (ier in (1, 2, 3, 4) and np.all(np.isfinite(params)) and params[0] > 0 and params[1] > 0
+            and 1e-6 < params[2] < 0.999 * b_max):
+        if not return_cov:
+            return params
+        dof = len(q) - len(params)
+        if cov is None or dof <= 0:
+            return params, np.full((3, 3), np.inf)
+        # Back from u to b: db/du = b * (1 - b / b_max)
+        scale = np.array([1, 1, params[2] * (1 - params[2] / b_max)])
+        return params, cov * np.outer(scale, scale) * np.sum(residuals(u)**2) / dof
+    return _fit_bounded(t, q, hyperbolic_decline, p0, return_cov)
+
+
+# Function to fit data to decline models
+def fit_decline_model(t, q, model_func, p0=None, return_cov=False):
+    # Levenberg-Marquardt (leastsq, without curve_fit's per-call overhead)
+    # with the analytic Jacobian from the data-driven guess first; if it
+    # fails or wanders to non-physical parameters, refit with bounds.
+    # Hyperbolic b is kept in bounds by a change of variable instead.
+    # With return_cov, also returns the parameter covariance (scaled by the
+    # residual variance, as curve_fit does); inf where it is undetermined.
+    t = np.asarray(t, dtype=float)
+    q = np.asarray(q, dtype=float)
+    if p0 is None:
+        p0 = initial_guess(t, q, model_func)
+    if model_func is hyperbolic_decline:
+        return _fit_hyperbolic(t, q, p0, return_cov)
+    jac = JACOBIANS.get(model_func, None)
+
+    def residuals(p):
+        return model_func(t, *p) - q
+
+    def jacobian(p):
+        return jac(t, *p).T
+
+    with np.errstate(all='ignore'):
+        params, cov, _, _, ier = leastsq(residuals, p0, Dfun=jacobian if jac else None, col_deriv=True,
+                                         full_output=True)
+    if ier in (1, 2, 3, 4) and np.all(np.isfinite(params)) and np.all(params > 0):
+        if not return_cov:
+            return params
+        dof = len(q) - len(params)
+        if cov is None or dof <= 0:
+            return params, np.full((len(params), len(params)), np.inf)
+        return params, cov * np.sum(residuals(params)**2) / dof
+    return _fit_bounded(t, q, model_func, p0, return_cov)
+
+
+# Robust fitting.  Zero, negative and shut-in records (rates far below the
+# running median, e.g. partial months) are dropped, the history is cut at
+# the last restart (a rate jump after which a new decline starts), and the
+# remaining points are fitted with a soft-L1 or Huber loss so that single
+# outliers such as choke changes no longer pull the curve.
+def shut_in_mask(q, window=5, min_fraction=0.2):
+    # True for records to keep: finite, positive and at least min_fraction
+    # of the running median of the positive rates around them
+    q = np.asarray(q, dtype=float)
+    keep = np.isfinite(q) & (q > 0)
+    positive = q[keep]
+    if len(positive) < window:
+        return keep
+    half = window // 2
+    padded = np.pad(positive, half, mode='edge')
+    median = np.median(sliding_window_view(padded, window), axis=1)
+    keep[np.flatnonzero(keep)[positive < min_fraction * median]] = False
+    return keep
+
+
+def restart_starts(q, jump_ratio=1.5, window=3):
+    # Indices where a new decline segment starts: the first record and every
+    # record where the median of the next window rates is at least
+    # jump_ratio times the median of the previous window (a single high
+    # record does not move either median)
+    q = np.asarray(q, dtype=float)
+    if len(q) < 2 * window:
+        return np.array([0])
+    medians = np.median(sliding_window_view(q, window), axis=1)
+    before, after = medians[:-window], medians[window:]
+    jumps = np.flatnonzero((after >= jump_ratio * before) & (q[window:len(q) - window + 1] >= jump_ratio * before)) + window
+    # keep the first index of every run of neighbouring detections
+    jumps = jumps[np.diff(jumps, prepend=-window) >= window]
+    return np.concatenate(([0], jumps))
+
+
+def prepare_history(t, q, window=5, min_fraction=0.2, jump_ratio=1.5, min_points=6):
+    # Cleaned records of the last decline segment with at least min_points
+    # points: (t - t0, q, t0), t0 being the segment start
+    t = np.asarray(t, dtype=float)
+    q = np.asarray(q, dtype=float)
+    keep = shut_in_mask(q, window, min_fraction)
+    t, q = t[keep], q[keep]
+    starts = restart_starts(q, jump_ratio)
+    usable = starts[starts <= len(q) - min_points]
+    start = usable[-1] if len(usable) else 0
+    t0 = t[start] if len(t) else 0.0
+    return t[start:] - t0, q[start:], t0
+
+
+def fit_decline_model_robust(t, q, model_func, p0=None, loss='soft_l1', f_scale=None, return_cov=False):
+    # Starts from the fast least-squares fit and refines it with a robust
+    # loss (least_squares, trust region reflective, with bounds; tolerances
+    # well below the data noise keep it to a few iterations).  f_scale,
+    # the residual size beyond which points count as outliers, defaults to
+    # 1.4826 * MAD of the starting residuals.  With return_cov, also returns
+    # the covariance from the loss-weighted Jacobian at the solution,
+    # (J^T J)^-1 * 2*cost/dof, as fit_decline_model does for least squares.
+    t = np.asarray(t, dtype=float)
+    q = np.asarray(q, dtype=float)
+    if p0 is None:
+        try:
+            p0 = fit_decline_model(t, q, model_func)
+        except (RuntimeError, ValueError):
+            p0 = initial_guess(t, q, model_func)
+    lower, upper = BOUNDS.get(model_func, (-np.inf, np.inf))
+    p0 = np.clip(p0, np.add(lower, 1e-12), upper)
+    jac = JACOBIANS.get(model_func, None)
+
+    def residuals(p):
+        return model_func(t, *p) - q
+
+    if f_scale is None:
+        with np.errstate(all='ignore'):
+            r = residuals(p0)
+        f_scale = 1.4826 * np.median(np.abs(r - np.median(r)))
+        f_scale = max(f_scale, 1e-3 * np.median(np.abs(q)), 1e-12)
+
+    with np.errstate(all='ignore'):
+        result = least_squares(residuals, p0, jac=(lambda p: jac(t, *p)) if jac else '2-point',
+                               bounds=(lower, upper), loss=loss, f_scale=f_scale, ftol=1e-6, xtol=1e-6)
+    if not result.success:
+        raise RuntimeError(f'Robust fit failed: {result.message}')
+    if not return_cov:
+        return result.x
+    n = len(result.x)
+    dof = len(q) - n
+    _, sv, vt = np.linalg.svd(result.jac, full_matrices=False)
+    if dof <= 0 or np.sum(sv > np.finfo(float).eps * max(result.jac.shape) * sv[0]) < n:
+        return result.x, np.full((n, n), np.inf)
+    return result.x, (vt.T / sv**2) @ vt * 2 * result.cost / dof
+
+
+def r_squared(q, q_fit):
+    ss_res = np.sum((q - q_fit)**2)
+    ss_tot = np.sum((q - np.mean(q))**2)
+    return 1 - (ss_res / ss_tot)
+
+
+class FitCache:
+    # Content-addressed cache of fitted parameters and R².  The key is a hash
+    # of the time and rate arrays, the model, its bounds and p0, so the same
+    # data always maps to the same entry no matter where it came from.
+    # Entries live in memory with LRU eviction and, if a directory is
+    # given, are also written there as .npz files and survive restarts.
+    # Files are written to a temporary name and renamed into place, so
+    # workers sharing the directory never see a partial entry; an entry
+    # that cannot be read anyway counts as a miss.
+
+    def __init__(self, maxsize=1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._items = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(t, q, model_func, p0=None, loss=None):
+        h = hashlib.sha256()
+        for a in (t, q):
+            a = np.ascontiguousarray(a, dtype=float)
+            h.update(str(a.shape).encode())
+            h.update(a.tobytes())
+        h.update(model_func.__name__.encode())
+        h.update(repr(BOUNDS.get(model_func)).encode())
+        if p0 is not None:
+            h.update(np.asarray(p0, dtype=float).tobytes())
+        if loss is not None:
+            h.update(loss.encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key]
+        if self.directory is not None and os.path.exists(self._path(key)):
+            try:
+                with np.load(self._path(key)) as f:
+                    value = (f['params'], float(f['r2']))
+            except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+                return None
+            self._remember(key, value)
+            return value
+        return None
+
+    def put(self, key, params, r2):
+        value = (np.asarray(params, dtype=float), float(r2))
+        self._remember(key, value)
+        if self.directory is not None:
+            fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, params=value[0], r2=value[1])
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                os.remove(tmp)
+                raise
+
+    def _remember(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Shared in-process cache; Streamlit reruns keep imported modules, so repeat
+# fits of the same data are served from here.
+FIT_CACHE = FitCache()
+
+
+def fit_decline_model_cached(t, q, model_func, p0=None, cache=FIT_CACHE, loss=None):
+    # (params, R²) of fit_decline_model, served from the cache when possible;
+    # with a loss ('soft_l1', 'huber', ...) of fit_decline_model_robust
+    key = cache.key(t, q, model_func, p0, loss)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    if loss is None:
+        params = fit_decline_model(t, q, model_func, p0)
+    else:
+        params = fit_decline_model_robust(t, q, model_func, p0, loss)
+    r2 = r_squared(q, model_func(t, *params))
+    cache.put(key, params, r2)
+    return params, r2
+
+
+def monte_carlo_forecast(t, params, cov, model_func=hyperbolic_decline, n=100_000, seed=None,
+                         block_size=4_000_000):
+    # Probabilistic forecast from a fit: n parameter sets are drawn from the
+    # multivariate normal N(params, cov), draws outside the model bounds
+    # are discarded, and rate and cumulative are evaluated for all draws at
+    # once.  Returns P10/P50/P90 rate and cumulative curves over t and the
+    # EUR (cumulative at t[-1]), in the reserves convention where P10 is
+    # the high case (exceeded with 10 % probability).  Time steps are
+    # processed in blocks of about block_size values to bound memory.
+    t = np.asarray(t, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    if not np.all(np.isfinite(cov)):
+        raise ValueError('The fit covariance is undetermined; a probabilistic forecast is not possible')
+    rng = np.random.default_rng(seed)
+    draws = rng.multivariate_normal(params, cov, size=n, method='eigh')
+    lower, upper = BOUNDS.get(model_func, (-np.inf, np.inf))
+    valid = np.all((draws > lower) & (draws <= upper), axis=1)
+    draws = draws[valid]
+    if len(draws) == 0:
+        raise ValueError('No sampled parameter set lies within the model bounds')
+
+    # One row per time step so the percentiles run along contiguous memory
+    p = draws.T
+    cumulative = CUMULATIVES[model_func]
+    levels = [90, 50, 10]
+    rate = np.empty((3, len(t)))
+    cum = np.empty((3, len(t)))
+    step = max(1, block_size // len(draws))
+    with np.errstate(all='ignore'):
+        for s in range(0, len(t), step):
+            ts = t[s:s + step, None]
+            rate[:, s:s + step] = np.percentile(model_func(ts, *p), levels, axis=1)
+            cum[:, s:s + step] = np.percentile(cumulative(*p, ts), levels, axis=1)
+    return {
+        'rate': dict(zip(['P10', 'P50', 'P90'], rate)),
+        'cumulative': dict(zip(['P10', 'P50', 'P90'], cum)),
+        'eur': dict(zip(['P10', 'P50', 'P90'], cum[:, -1])),
+        'realizations': len(draws),
+    }
+
+
+MODELS = {
+    'Exponential': exponential_decline,
+    'Harmonic': harmonic_decline,
+    'Hyperbolic': hyperbolic_decline,
+}
+
+
+def fit_well(t, q, cache=None, robust=False):
+    # Fits all three models to one well.  Returns one dict per model with
+    # qi, di, b (0 for exponential, 1 for harmonic), R² and t0, the time the
+    # fitted decline starts at; a model that does not converge, or a well
+    # with fewer records than the model has parameters, is reported with NaN
+    # parameters.  robust fits the cleaned last decline segment
+    # (prepare_history) with a soft-L1 loss.
+    t0 = 0.0
+    loss = None
+    if robust:
+        t, q, t0 = prepare_history(t, q)
+        loss = 'soft_l1'
+    rows = []
+    for name, func in MODELS.items():
+        try:
+            if len(q) < len(BOUNDS[func][0]):
+                # e.g. a shut-in well: nothing left to fit
+                raise ValueError('Fewer records than model parameters')
+            if cache is not None:
+                params, r2 = fit_decline_model_cached(t, q, func, cache=cache, loss=loss)
+            else:
+                if robust:
+                    params = fit_decline_model_robust(t, q, func, loss=loss)
+                else:
+                    params = fit_decline_model(t, q, func)
+                r2 = r_squared(q, func(t, *params))
+        except (RuntimeError, ValueError, TypeError):
+            params = np.full(3 if name == 'Hyperbolic' else 2, np.nan)
+            r2 = np.nan
+        qi, di = params[:2]
+        b = params[2] if name == 'Hyperbolic' else (0.0 if name == 'Exponential' else 1.0)
+        rows.append({'model': name, 'qi': qi, 'di': di, 'b': b, 'r2': r2, 't0': t0})
+    return rows
+
+
+def _fit_chunk(wells, cache_dir=None, robust=False):
+    cache = FitCache(directory=cache_dir) if cache_dir is not None else None
+    rows = []
+    for well_id, t, q in wells:
+        for row in fit_well(t, q, cache, robust):
+            row['well_id'] = well_id
+            rows.append(row)
+    return rows
+
+
+def split_wells(table, well_col='well_id', time_col='time', rate_col='rate'):
+    # (well_id, t, q) per well from a long-format table, using one sort and
+    # the group boundaries instead of a groupby per well.
+    table = table.sort_values([well_col, time_col], kind='stable')
+    wells = table[well_col].to_numpy()
+    t = table[time_col].to_numpy(dtype=float)
+    q = table[rate_col].to_numpy(dtype=float)
+    ids, starts = np.unique(wells, return_index=True)
+    order = np.argsort(starts)
+    ids, starts = ids[order], starts[order]
+    stops = np.append(starts[1:], len(wells))
+    return [(w, t[a:b], q[a:b]) for w, a, b in zip(ids, starts, stops)]
+
+
+def _chunks(wells, chunk_size):
+    wells = iter(wells)
+    while chunk := list(islice(wells, chunk_size)):
+        yield chunk
+
+
+def fit_well_stream(wells, workers=None, chunk_size=100, cache_dir=None, robust=False):
+    # Fits an iterable of (well_id, t, q), e.g. production.iter_wells, and
+    # returns one tidy row per well and model (well_id, model, qi, di, b,
+    # r2, t0, best).  Wells are sent to a process pool in chunks of chunk_size
+    # with at most two chunks per worker in flight, so a lazy iterable is
+    # consumed only as fast as it is fitted.  With cache_dir, fits are also
+    # stored in / served from a FitCache on disk shared by all workers.
+    # robust is passed on to fit_well.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = _chunks(wells, chunk_size)
+    head = list(islice(chunks, 2))
+
+    rows = []
+    if workers > 1 and len(head) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in chain(head, chunks):
+                pending.append(pool.submit(_fit_chunk, chunk, cache_dir, robust))
+                if len(pending) >= 2 * workers:
+                    rows.extend(pending.popleft().result())
+            while pending:
+                rows.extend(pending.popleft().result())
+    else:
+        for chunk in chain(head, chunks):
+            rows.extend(_fit_chunk(chunk, cache_dir, robust))
+
+    params = pd.DataFrame(rows, columns=['well_id', 'model', 'qi', 'di', 'b', 'r2', 't0'])
+    # Exactly one best model per well (the first on ties); wells without a
+    # finite R², e.g. all-zero rates, have none
+    fitted = params[np.isfinite(params['r2'].to_numpy(dtype=float))]
+    params['best'] = params.index.isin(fitted.groupby('well_id', sort=False)['r2'].idxmax())
+    return params
+
+
+def fit_wells(table, well_col='well_id', time_col='time', rate_col='rate', workers=None, chunk_size=100,
+              cache_dir=None, robust=False):
+    # Same for a long-format production table already in memory
+    return fit_well_stream(split_wells(table, well_col, time_col, rate_col), workers, chunk_size, cache_dir, robust)
@@ -4,10 +4,12 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
 import plotly.graph_objects as go
-from math import pi
-import sympy as sp
 from PIL import Image
 
+import trajectory as traj
+import survey
+import sweep
+
 # Initialize session state for navigation
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
@@ -21,7 +23,7 @@ if st.session_state.page == 'home':
     st.markdown("*<h2 style='text-align: right; font-size: 20px;text-decoration: italy; font-family: Lucida Bright, sans-serif; margin-bottom: 0; color: green;'>Unleash the Trajectory!!</h2>*", unsafe_allow_html=True)
     st.markdown("*Welcome to the Directional Drilling Well Profile Trajectory Calculator!*  \n    \n  *This tool is designed to assist drilling engineers and geologists in calculating and visualizing the trajectory of directional drilling profiles. By inputting key parameters such as Kick off Point, vertical depth of Target, horizontal distance to Target, and other corner values, this calculator provides accurate and efficient calculations of drilling trajectories. Whether you're planning a new well or analyzing an existing profile, our calculator helps you determine the build and hold sections of your drilling path, ensuring precision in achieving desired targets. With interactive visualizations and user-friendly interfaces, you can easily monitor the different parameters at any point along the path to the target.*")
     
-    input_method = st.radio('**Please Select the Type of Drilling profile:**', ('Build and Hold Profile', 'Build, Hold and Drop Profile', 'Slanted Buildup Profile', 'Horizontal Single Buildup Profile', 'Horizontal Double Buildup Profile'), index = None)
+    input_method = st.radio('**Please Select the Type of Drilling profile:**', ('Build and Hold Profile', 'Build, Hold and Drop Profile', 'Slanted Buildup Profile', 'Horizontal Single Buildup Profile', 'Horizontal Double Buildup Profile', 'Actual Survey vs. Planned Profile', 'Build Rate and KOP Sensitivity Sweep'), index = None)
 
     if input_method == 'Build and Hold Profile':
         st.session_state.page = 'Build_Hold'
@@ -38,6 +40,12 @@ if st.session_state.page == 'home':
     elif input_method == 'Horizontal Double Buildup Profile':
         st.session_state.page = 'Horizontal_Double'
         st.rerun()
+    elif input_method == 'Actual Survey vs. Planned Profile':
+        st.session_state.page = 'Survey'
+        st.rerun()
+    elif input_method == 'Build Rate and KOP Sensitivity Sweep':
+        st.session_state.page = 'Sweep'
+        st.rerun()
 
 
 elif st.session_state.page == 'Build_Hold':
@@ -55,20 +63,15 @@ elif st.session_state.page == 'Build_Hold':
     Ht = st.sidebar.number_input('Enter Horizontal Distance to Target (ft)', value=6000.0, min_value=0.0, step = 0.01)
     build_rate = st.sidebar.number_input('Enter Build Rate (degrees per 100 ft)', value=1.5, min_value=0.0, step = 0.01)
     
-    def radius_of_curvature(build_rate):
-       return 18000 / (np.pi * build_rate)
-    r = radius_of_curvature(build_rate)
-
-    def Inclination_angle(Ht, Vt, Vb, r ):
-       X = np.arctan((Ht - r)/(Vt - Vb))
-       Y = np.arcsin((r*np.cos(X))/(Vt - Vb))
-       return np.degrees(X) + np.degrees(Y)
-    a = Inclination_angle(Ht, Vt, Vb, r)
-
-    Vc = Vb + r*np.sin(np.radians(a))
-    Hc = r*(1-np.cos(np.radians(a)))
-    MDc = Vb + (a/build_rate)*100
-    MDt = MDc + (Vt - Vc)/np.cos(np.radians(a))
+    plan = traj.build_hold(Vb, Vt, Ht, build_rate)
+    if not plan['feasible']:
+        st.sidebar.error('The target cannot be reached with this KOP and build rate.')
+        st.stop()
+    r, a = plan['r'], plan['a']
+    points = plan['stations']
+    _, _, Vc, _ = points['tvd']
+    _, _, Hc, _ = points['h']
+    _, _, MDc, MDt = points['md']
     b = st.sidebar.button('Show the Profile Trajectories')
     if b:
 
@@ -87,30 +90,12 @@ elif st.session_state.page == 'Build_Hold':
         st.subheader('***The Profile trajectory is shown as below:***')
         st.table(df)
 
-        MDx_values = np.linspace(0, MDt, round(MDt))
-        Vx_values = []
-        Hx_values = []
-        a_values = []
-
-        for MDx in MDx_values:
-            if MDx <= Vb:
-                Vx = MDx
-                Hx = 0
-                a_x = 0
-            elif MDx <= MDc:
-                a1 = (MDx - Vb)*build_rate/100
-                Vx = Vb + r*np.sin(np.radians(a1))
-                Hx = r*(1-np.cos(np.radians(a1)))
-                a_x = a1
-            else:
-                CX = MDx - MDc
-                Vx = Vc + CX*np.cos(np.radians(a))
-                Hx = Hc + CX*np.sin(np.radians(a))
-                a_x = a
-            Vx_values.append(Vx)
-            Hx_values.append(Hx)
-            a_values.append(a_x)
-        
+        path = traj.evaluate(points, traj.adaptive_md(points))
+        MDx_values = path['md']
+        Vx_values = path['tvd']
+        Hx_values = path['h']
+        a_values = path['inc']
+
         fig, ax = plt.subplots()
         #ax.plot(Hx_values,Vx_values , label='Build and Hold Trajectory')
         
@@ -178,28 +163,15 @@ elif st.session_state.page == 'Build_Hold_Drop':
     build_rate_2 = st.sidebar.number_input('Enter Build Rate 1 (degrees per 100 ft)', value=2.0, min_value=0.0, step = 0.01)
     a2 = st.sidebar.number_input('Enter the Inclination angle after Drop (degrees)', value=20.0, min_value=0.0, step=0.01)
 
-    def radius_of_curvature(build_rate):
-        return 18000 / (np.pi * build_rate)
-    r1 = radius_of_curvature(build_rate_1)
-    r2 = radius_of_curvature(build_rate_2)
-    OQ = Ht - r1 - r2*np.cos(np.radians(a2)) - (Vt - Ve)*np.tan(np.radians(a2))
-    OP = Ve - Vb + r2*np.sin(np.radians(a2))
-    QS = r1+r2
-    PQ = np.sqrt(OP**2 + OQ**2)
-    PS = np.sqrt(PQ**2 - QS**2)
-    X = np.arctan(OQ/OP)
-    Y = np.arctan(QS/PS)
-    a1 = np.degrees(X) + np.degrees(Y)
-    CD = PS
-    Vc = Vb + r1*np.sin(np.radians(a1))
-    Hc = r1*(1-np.cos(np.radians(a1)))
-    MDc = Vb + (a1/build_rate_1)*100
-    Vd = Vc + CD*np.cos(np.radians(a1))
-    Hd = Hc + CD*np.sin(np.radians(a1))
-    MDd = MDc + CD
-    He = Hd + r2*(np.cos(np.radians(a2)) - np.cos(np.radians(a1)))
-    MDe = MDd + (a1 - a2)*100/build_rate_2
-    MDt = MDe + (Vt - Ve)/np.cos(np.radians(a2))
+    plan = traj.build_hold_drop(Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2)
+    if not plan['feasible']:
+        st.sidebar.error('The target cannot be reached with these build rates and end of drop.')
+        st.stop()
+    r1, r2, a1 = plan['r1'], plan['r2'], plan['a1']
+    points = plan['stations']
+    _, _, Vc, Vd, _, _ = points['tvd']
+    _, _, Hc, Hd, He, _ = points['h']
+    _, _, MDc, MDd, MDe, MDt = points['md']
 
     p = st.sidebar.button('Show the Profile Trajectories')
     if p:
@@ -217,47 +189,14 @@ elif st.session_state.page == 'Build_Hold_Drop':
         st.subheader('***The Profile trajectory is shown as below:***')
         st.table(df)
 
-        MDx_values = np.linspace(0, MDt, round(MDt))
-        Vx_values = []
-        Hx_values = []
-        a1_values = []
-        drop_values = []
-
-        for MDx in MDx_values:
-            if MDx <= Vb:
-                Vx = MDx
-                Hx = 0
-                a_1 = 0
-                dr = 0
-            elif MDx <= MDc:
-                a_1 = (MDx - Vb)*build_rate_1/100
-                dr = 0
-                Vx = Vb + r1*np.sin(np.radians(a_1))
-                Hx = r1*(1-np.cos(np.radians(a_1)))
-            elif MDx <= MDd:
-                CX = MDx - MDc
-                Vx = Vc + CX*np.cos(np.radians(a1))
-                Hx = Hc + CX*np.sin(np.radians(a1))
-                a_1 = a1
-                dr = 0
-            elif MDx <= MDe:
-                a_1 = a1
-                a_2 = (MDx - MDd)*build_rate_2/100
-                Vx = Vd + r2*(np.sin(np.radians(a1)) - np.sin(np.radians(a1 - a_2)))
-                Hx = Hd + r2*(np.cos(np.radians(a1-a_2)) - np.cos(np.radians(a1)))
-                dr = a_2
-            else:
-                EX = MDx - MDe
-                Vx= Ve + EX*np.cos(np.radians(a2))
-                Hx = He + EX*np.sin(np.radians(a2))
-                a_1 = a1
-                dr = a_2
-
-            Vx_values.append(Vx)
-            Hx_values.append(Hx)
-            a1_values.append(a_1)
-            drop_values.append(dr)
- 
+        path = traj.evaluate(points, traj.adaptive_md(points))
+        MDx_values = path['md']
+        Vx_values = path['tvd']
+        Hx_values = path['h']
+        a1_values = np.where(MDx_values <= MDd, path['inc'], a1)
+        drop_values = np.where(MDx_values <= MDd, 0, a1 - path['inc'])
+        dr = a1 - a2
+
         plt.style.use('classic')
         
         fig, ax = plt.subplots()
@@ -324,30 +263,16 @@ elif st.session_state.page == 'Slanted':
     a1 = st.sidebar.number_input('Enter the inclination angle at Start (degrees): ', value=30.0, min_value=0.0, step=0.01)
     build_rate = st.sidebar.number_input('Enter Build Rate (degrees per 100 ft)', value=1.5, min_value=0.0, step = 0.01)
     # Calculations
-    def radius_of_curvature(build_rate):
-        return 18000 / (np.pi * build_rate)
-    r1 = radius_of_curvature(build_rate)
-
-    NT = Ht - Vt*np.tan(np.radians(a1))
-    QT = NT *np.cos(np.radians(a1))
-    NQ = NT *np.sin(np.radians(a1))
-    AN = Vt/(np.cos(np.radians(a1)))
-    AQ = AN + NQ
-    X = np.arctan((QT - r1)/(AQ - MDb))
-    Y = np.arcsin((r1*np.cos(X))/(AQ - MDb))
-    a2 = np.degrees(X) + np.degrees(Y)
-    at = a1 + a2
-    CM = r1*(1-np.cos(np.radians(a2)))/(np.cos(np.radians(a1)))
-    AD = MDb + r1*np.sin(np.radians(a2))
-    DM = r1*(1- np.cos(np.radians(a2)))*np.tan(np.radians(a1))
-    AM = AD - DM
+    plan = traj.slanted(MDb, Vt, Ht, a1, build_rate)
+    if not plan['feasible']:
+        st.sidebar.error('The target cannot be reached with this slant angle, KOP and build rate.')
+        st.stop()
+    r1, a2, at = plan['r1'], plan['a2'], plan['at']
+    points = plan['stations']
     # Corner Points
-    Vb = MDb*np.cos(np.radians(a1))
-    Hb = MDb*np.sin(np.radians(a1))
-    Vc = AM*np.cos(np.radians(a1))
-    Hc = AM*np.sin(np.radians(a1)) + CM
-    MDc = MDb + a2*100/build_rate
-    MDt = MDc + (Vt-Vc)/np.cos(np.radians(at))
+    _, Vb, Vc, _ = points['tvd']
+    _, Hb, Hc, _ = points['h']
+    _, _, MDc, MDt = points['md']
 
     s = st.sidebar.button('Show the Profile Trajectories')
     if s:
@@ -364,44 +289,13 @@ elif st.session_state.page == 'Slanted':
         st.subheader('***The Profile trajectory is shown as below:***')
         st.table(df)
 
-        MDx_values = np.linspace(0, MDt, round(MDt))
-        Vx_values = []
-        Hx_values = []
-        a2_values = []
-        at_values =[]
-
-
-        for MDx in MDx_values:
-
-
-            if MDx <= MDb:
-                Vx = MDx*np.cos(np.radians(a1))
-                Hx = MDx*np.sin(np.radians(a1))
-                a2x = 0
-                atx = a1 + a2x
-            elif MDx <= MDc:
-                a_2 = (MDx - MDb)*build_rate/100
-                a2x =a_2
-                atx = a1 + a2x
-                CMx = r1*(1-np.cos(np.radians(a_2)))/(np.cos(np.radians(a1)))
-                ADx = MDb + r1*np.sin(np.radians(a_2))
-                DMx = r1*(1- np.cos(np.radians(a_2)))*np.tan(np.radians(a1))
-                AMx = ADx - DMx
-
-                Vx = AMx*np.cos(np.radians(a1))
-                Hx = AMx*np.sin(np.radians(a1)) + CMx
-            else:
-                CX = MDx - MDc
-                Vx = Vc + CX*np.cos(np.radians(at))
-                Hx = Hc + CX*np.sin(np.radians(at))
-                a2x = a2
-                atx = a1 + a2x
-
-            Vx_values.append(Vx)
-            Hx_values.append(Hx)
-            a2_values.append(a2x)
-            at_values.append(atx)
-        
+        path = traj.evaluate(points, traj.adaptive_md(points))
+        MDx_values = path['md']
+        Vx_values = path['tvd']
+        Hx_values = path['h']
+        a2_values = path['inc'] - a1
+        at_values = path['inc']
+
         fig, ax = plt.subplots()
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=Hx_values, y=Vx_values, mode='lines', name='Trajectory',
@@ -461,15 +355,15 @@ elif st.session_state.page == 'Horizontal_Single':
     Ht = st.sidebar.number_input('Enter Horizontal Distance to Target (ft)', value=12000.0, min_value=0.0, step = 0.01)
     L = st.sidebar.number_input('Enter the Horizontal Length to be drilled (ft)', value=2000.0, min_value=0.0, step = 0.01)
 
-    r = Ht - L
-    build_rate = 18000/(r*(pi))
-    Vb = Vt - r
-    MDb = Vb
-    Vc = Vt
-    Hc = r
-    MDc = MDb + 90*100/build_rate
-    Ht = Hc + L
-    MDt = MDc + L
+    plan = traj.horizontal_single(Vt, Ht, L)
+    if not plan['feasible']:
+        st.sidebar.error('The target cannot be reached: the horizontal distance must exceed the horizontal length, by no more than the target TVD.')
+        st.stop()
+    r, build_rate = plan['r'], plan['build_rate']
+    points = plan['stations']
+    _, Vb, Vc, _ = points['tvd']
+    _, _, Hc, Ht = points['h']
+    _, MDb, MDc, MDt = points['md']
     
     h = st.sidebar.button('Show the Profile Trajectories')
     if h:
@@ -485,32 +379,11 @@ elif st.session_state.page == 'Horizontal_Single':
         st.subheader('***The Profile trajectory is shown as below:***')
         st.table(df)
 
-        MDx_values = np.linspace(0, MDt, round(MDt))
-        Vx_values = []
-        Hx_values = []
-        a_values = []
-
-        for MDx in MDx_values:
-
-
-            if MDx <= Vb:
-                Vx = MDx
-                Hx = 0
-                ax = 0
-            elif MDx <= MDc:
-                a1 = (MDx - Vb)*build_rate/100
-                Vx = Vb + r*np.sin(np.radians(a1))
-                Hx = r*(1-np.cos(np.radians(a1)))
-                ax = a1
-            else:
-                CX = MDx - MDc
-                Vx = Vt
-                Hx = Hc + CX
-                ax = 90
-
-            Vx_values.append(Vx)
-            Hx_values.append(Hx)
-            a_values.append(ax)
+        path = traj.evaluate(points, traj.adaptive_md(points))
+        MDx_values = path['md']
+        Vx_values = path['tvd']
+        Hx_values = path['h']
+        a_values = path['inc']
         
         fig, ax = plt.subplots()
         fig = go.Figure()
@@ -570,35 +443,18 @@ elif st.session_state.page == 'Horizontal_Double':
     Vt = st.sidebar.number_input('Enter TVD of Target (ft)', value=10000.0, min_value=0.0, step = 0.01)
     Ht = st.sidebar.number_input('Enter Horizontal Distance to Target (ft)', value=16000.0, min_value=0.0, step = 0.01)
     L = st.sidebar.number_input('Enter the Horizontal Length to be drilled (ft)', value=2000.0, min_value=0.0, step = 0.01)
-    a1 = st.sidebar.number_input('Enter the inclination angle of first buildup (degrees): ', value=60.0, min_value=0.0, step=0.01)
+    a1 = st.sidebar.number_input('Enter the inclination angle of first buildup (degrees): ', value=60.0, min_value=0.0, max_value=89.99, step=0.01)
     build_rate_1 = st.sidebar.number_input('Enter Build Rate 1 (degrees per 100 ft)', value=1.5, min_value=0.0, step = 0.01)
 
-    def radius_of_curvature(build_rate):
-        return 18000 / (np.pi * build_rate)
-    r1 = radius_of_curvature(build_rate_1)
-
-    a2 = 90-a1
-    Vc = Vb + r1*np.sin(np.radians(a1))
-    Hc = r1*(1-np.cos(np.radians(a1)))
-    MDb = Vb
-    MDc = Vb + (a1/build_rate_1)*100
-    He = Ht - L
-    CD, r2 = sp.symbols('CD r2')
-    eq1 = sp.Eq(Vt, Vc + CD*np.cos(np.radians(a1)) + r2*(1-np.cos(np.radians(a2))))
-    eq2 = sp.Eq(Ht, Hc + CD*np.sin(np.radians(a1)) + r2*np.sin(np.radians(a2)) + L)
-    sol = sp.solve([eq1, eq2], [CD, r2])
-    # CD = sol[0][0]
-    # r2 = sol[1][0]
-    CD = float(sol[CD])
-    r2 = float(sol[r2])
-    build_rate_2 = 18000/(pi*r2)
-    Hd = Hc + CD*np.sin(np.radians(a1))
-    Vd = Vc + CD*np.cos(np.radians(a1))
-    MDd = MDc + CD
-
-    MDe = MDd + a2*100/build_rate_2
-    Ve = Vt
-    MDt = MDe + L
+    plan = traj.horizontal_double(Vb, Vt, Ht, L, a1, build_rate_1)
+    if not plan['feasible']:
+        st.sidebar.error('The target cannot be reached with this first buildup and horizontal length.')
+        st.stop()
+    r1, r2, a2, build_rate_2 = plan['r1'], plan['r2'], plan['a2'], plan['build_rate_2']
+    points = plan['stations']
+    _, _, Vc, Vd, Ve, _ = points['tvd']
+    _, _, Hc, Hd, He, _ = points['h']
+    _, _, MDc, MDd, MDe, MDt = points['md']
     at = a1 + a2
 
     q = st.sidebar.button('Show the Profile Trajectories')
@@ -618,57 +474,13 @@ elif st.session_state.page == 'Horizontal_Double':
         st.subheader('***The Profile trajectory is shown as below:***')
         st.table(df)
 
-        MDx_values = np.linspace(0, MDt, round(MDt))
-        Vx_values = []
-        Hx_values = []
-        a1_values = []
-        a2_values = []
-        at_values = []
-
-
-        # Calculate Vx and Hx for each MDx
-        for MDx in MDx_values:
-
-            if MDx <= Vb:
-                Vx = MDx
-                Hx = 0
-                a1x = 0
-                a2x = 0
-                atx = a1x + a2x
-            elif MDx <= MDc:
-                a_1 = (MDx - Vb) * build_rate_1 / 100
-                Vx = Vb + r1 * np.sin(np.radians(a_1))
-                Hx = r1 * (1 - np.cos(np.radians(a_1)))
-                a1x = a_1
-                a2x = 0
-                atx = a1x + a2x
-            elif MDx <= MDd:
-                CX = MDx - MDc
-                Vx = Vc + CX * np.cos(np.radians(a1))
-                Hx = Hc + CX * np.sin(np.radians(a1))
-                a1x = a1
-                a2x = 0
-                atx = a1x + a2x
-            elif MDx <= MDe:
-                a_2 = (MDx - MDd) * build_rate_2 / 100
-                Vx = Vd + r2 * (np.sin(np.radians(a1+a_2)) - np.sin(np.radians(a1)))
-                Hx = Hd + r2 * (np.cos(np.radians(a1)) - np.cos(np.radians(a1 + a_2)))
-                a1x = a1
-                a2x =a_2
-                atx =a1x + a2x
-            else:
-                EX = MDx - MDe
-                Vx = Ve
-                Hx = He + EX
-                a1x = a1
-                a2x = a2
-                atx = a1x + a2x
-
-            Vx_values.append(Vx)
-            Hx_values.append(Hx)
-            a1_values.append(a1x)
-            a2_values.append(a2x)
-            at_values.append(atx)
+        path = traj.evaluate(points, traj.adaptive_md(points))
+        MDx_values = path['md']
+        Vx_values = path['tvd']
+        Hx_values = path['h']
+        a1_values = np.minimum(path['inc'], a1)
+        a2_values = path['inc'] - a1_values
+        at_values = path['inc']
         
         fig, ax = plt.subplots()
         #ax.plot(Hx_values,Vx_values , label='Build, Hold & Drop Trajectory')
@@ -721,3 +533,120 @@ elif st.session_state.page == 'Read_Horizontal_Double':
     #st.image(r'C:\Users\Devesh Kumar Singh\Pictures\Directional Drilling app\HD2.png', use_column_width=True)
     st.image(Image.open('images/HD1.png'), use_column_width=True)
     st.image(Image.open('images/HD2.png'), use_column_width=True)
+
+elif st.session_state.page == 'Survey':
+    st.write('*The actual wellpath is computed from the survey stations (MD, inclination, azimuth) by the minimum curvature method, giving northing, easting, TVD and dogleg severity at every station. It is projected on the vertical section azimuth and overlaid on the planned profile.*')
+    st.sidebar.write('Actual Survey vs. Planned Profile')
+    st.sidebar.title('Enter the Planned Profile Parameters')
+
+    plan_type = st.sidebar.radio('Planned Profile', ('Build and Hold Profile', 'Build, Hold and Drop Profile'))
+    Vb = st.sidebar.number_input('Enter KOP Depth (ft)', value=1000.0, min_value=0.0, step = 0.01)
+    Vt = st.sidebar.number_input('Enter TVD of Target (ft)', value=10000.0, min_value=0.0, step = 0.01)
+    Ht = st.sidebar.number_input('Enter Horizontal Distance to Target (ft)', value=6000.0, min_value=0.0, step = 0.01)
+    if plan_type == 'Build and Hold Profile':
+        build_rate = st.sidebar.number_input('Enter Build Rate (degrees per 100 ft)', value=1.5, min_value=0.0, step = 0.01)
+        plan = traj.build_hold(Vb, Vt, Ht, build_rate)
+    else:
+        Ve = st.sidebar.number_input('Enter the Vertical Distance to the End of Drop (ft)', value=8000.0, min_value=0.0, step=0.01)
+        build_rate_1 = st.sidebar.number_input('Enter Build Rate 1 (degrees per 100 ft)', value=1.5, min_value=0.0, step = 0.01)
+        build_rate_2 = st.sidebar.number_input('Enter Build Rate 2 (degrees per 100 ft)', value=2.0, min_value=0.0, step = 0.01)
+        a2 = st.sidebar.number_input('Enter the Inclination angle after Drop (degrees)', value=20.0, min_value=0.0, step=0.01)
+        plan = traj.build_hold_drop(Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2)
+    vs_azimuth = st.sidebar.number_input('Enter Vertical Section Azimuth (degrees)', value=0.0, min_value=0.0, max_value=360.0, step=0.01)
+
+    uploaded_file = st.file_uploader("Upload your 'md|inc|azi' survey CSV file  \n*(#An optional well column selects one well when the file holds several.)*", type=["csv"])
+    if uploaded_file is not None:
+        try:
+            path = survey.compute_wellpath(survey.read_survey(uploaded_file))
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        if 'well' in path.columns:
+            well = st.selectbox('Select the Well', path['well'].unique())
+            path = path[path['well'] == well]
+        path = path.assign(vs=survey.vertical_section(path['north'], path['east'], vs_azimuth))
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=path['vs'], y=path['tvd'], mode='lines+markers', name='Actual (Survey)',
+                         hovertemplate='MD: %{customdata[0]}<br>VS: %{x}<br>TVD: %{y}<br>Inclination: %{customdata[1]}°<br>DLS: %{customdata[2]}°/100ft', customdata=np.column_stack((path['md'], path['inc'], path['dls'])), line=dict(width= 4)))
+        if plan['feasible']:
+            points = plan['stations']
+            planned = traj.evaluate(points, traj.adaptive_md(points))
+            fig.add_trace(go.Scatter(x=planned['h'], y=planned['tvd'], mode='lines', name='Planned',
+                             hovertemplate='MD: %{customdata[0]}<br>H: %{x}<br>V: %{y}<br>Inclination: %{customdata[1]}°', customdata=np.column_stack((planned['md'], planned['inc'])), line=dict(width= 4, dash='dash')))
+        else:
+            st.sidebar.error('The planned target cannot be reached with these parameters.')
+        fig.update_layout(
+        title='Actual vs. Planned Profile',
+        xaxis_title='Vertical Section (ft)',
+        yaxis_title='True Vertical Depth (ft)',
+        yaxis=dict(
+        autorange='reversed'),
+        hovermode='closest')
+        st.plotly_chart(fig)
+
+        st.sidebar.write(f'Maximum Dogleg Severity: {path["dls"].max():.2f}°/100ft')
+        st.subheader('Minimum Curvature Wellpath Data')
+        st.write(pd.DataFrame({'Measured Depth (MD),ft': path['md'], 'Inclination (°)': path['inc'], 'Azimuth (°)': path['azi'], 'Northing, ft': path['north'], 'Easting, ft': path['east'], 'TVD, ft': path['tvd'], 'Vertical Section, ft': path['vs'], 'Dogleg Severity (°/100ft)': path['dls']}))
+
+elif st.session_state.page == 'Sweep':
+    st.write('*Every combination of the build rates, KOP and inclination ranges below is planned at once. The heatmap shows the shortest feasible MD to target for each KOP and first build rate over all the other parameters.*')
+    st.sidebar.write('Build Rate and KOP Sensitivity Sweep')
+    st.sidebar.title('Enter the known Parameters required')
+
+    profile = st.sidebar.radio('Profile', ('Build, Hold and Drop Profile', 'Horizontal Double Buildup Profile'))
+    Vt = st.sidebar.number_input('Enter TVD of Target (ft)', value=10000.0, min_value=0.0, step = 0.01)
+    if profile == 'Build, Hold and Drop Profile':
+        Ht = st.sidebar.number_input('Enter Horizontal Distance to Target (ft)', value=6000.0, min_value=0.0, step = 0.01)
+        Ve = st.sidebar.number_input('Enter the Vertical Distance to the End of Drop (ft)', value=8000.0, min_value=0.0, step=0.01)
+    else:
+        Ht = st.sidebar.number_input('Enter Horizontal Distance to Target (ft)', value=16000.0, min_value=0.0, step = 0.01)
+        L = st.sidebar.number_input('Enter the Horizontal Length to be drilled (ft)', value=2000.0, min_value=0.0, step = 0.01)
+    # Largest number of steps per parameter that keeps the grid within the sweep budget
+    n_axes = 4 if profile == 'Build, Hold and Drop Profile' else 3
+    max_steps = int(round(sweep.MAX_PLANS ** (1 / n_axes), 6))
+    steps = st.sidebar.number_input('Enter the Grid Steps per Parameter', value=25, min_value=2, max_value=max_steps, step=1)
+    br1 = st.sidebar.slider('Build Rate 1 range (degrees per 100 ft)', min_value=0.5, max_value=6.0, value=(1.0, 3.0))
+    kop = st.sidebar.slider('KOP Depth range (ft)', min_value=0.0, max_value=5000.0, value=(500.0, 3000.0))
+    if profile == 'Build, Hold and Drop Profile':
+        br2 = st.sidebar.slider('Build Rate 2 range (degrees per 100 ft)', min_value=0.5, max_value=6.0, value=(1.0, 3.0))
+        a2 = st.sidebar.slider('Inclination after Drop range (degrees)', min_value=0.0, max_value=60.0, value=(10.0, 30.0))
+        st.sidebar.caption('The hold inclination is not swept directly: it is solved for every plan from the build rates, KOP and the inclination after the drop.')
+    else:
+        a1 = st.sidebar.slider('Inclination of first Buildup range (degrees)', min_value=1.0, max_value=89.0, value=(30.0, 70.0))
+
+    w = st.sidebar.button('Run the Sweep')
+    if w:
+        if steps ** n_axes > sweep.MAX_PLANS:
+            st.error(f'{steps ** n_axes:,} plans exceed the sweep budget of {sweep.MAX_PLANS:,}; use fewer grid steps.')
+            st.stop()
+        if profile == 'Build, Hold and Drop Profile':
+            table = sweep.sweep_build_hold_drop(Vt, Ht, Ve, np.linspace(*br1, steps), np.linspace(*br2, steps),
+                                                np.linspace(*kop, steps), np.linspace(*a2, steps))
+        else:
+            table = sweep.sweep_horizontal_double(Vt, Ht, L, np.linspace(*br1, steps), np.linspace(*kop, steps),
+                                                  np.linspace(*a1, steps))
+        st.sidebar.write(f'Plans evaluated: {steps ** n_axes}')
+        st.sidebar.write(f'Feasible plans: {len(table)}')
+        if table.empty:
+            st.error('None of the plans reaches the target with these parameter ranges.')
+            st.stop()
+
+        best = sweep.best_plans(table, 'build_rate_1', 'kop')
+        fig = go.Figure()
+        if profile == 'Build, Hold and Drop Profile':
+            hold = sweep.best_plans(table, 'build_rate_1', 'kop', 'hold_inclination')
+            fig.add_trace(go.Heatmap(z=best.values, x=best.columns, y=best.index, colorbar=dict(title='MD (ft)'), customdata=hold.values,
+                             hovertemplate='Build Rate 1: %{x}°/100ft<br>KOP: %{y} ft<br>MD to Target: %{z} ft<br>Hold Inclination: %{customdata:.2f}°<extra></extra>'))
+        else:
+            fig.add_trace(go.Heatmap(z=best.values, x=best.columns, y=best.index, colorbar=dict(title='MD (ft)'),
+                             hovertemplate='Build Rate 1: %{x}°/100ft<br>KOP: %{y} ft<br>MD to Target: %{z} ft<extra></extra>'))
+        fig.update_layout(
+        title=f'Shortest MD to Target, {profile}',
+        xaxis_title='Build Rate 1 (degrees per 100 ft)',
+        yaxis_title='KOP Depth (ft)',
+        hovermode='closest')
+        st.plotly_chart(fig)
+
+        st.subheader('Shortest Feasible Plans')
+        st.write(table.nsmallest(20, 'md_to_target').rename(columns={'a2': 'inclination_after_drop'}))
@@ -0,0 +1,121 @@
+import numpy as np
+
+# Full 3D permeability tensors from principal permeabilities and bedding
+# orientation, for every cell of a simulation grid.
+#
+# Grid axes: x east, y north, z down.  kx acts along the dip direction of
+# the bedding, ky along strike and kz normal to the bedding; dip (deg, down
+# from horizontal) and azimuth (deg, of the dip direction, clockwise from
+# north) give the rotation R whose columns are those three directions, and
+#     K = R diag(kx, ky, kz) R^T
+# is formed for a whole chunk of cells with one batched einsum.  With
+# azimuth 0 the y-z block reproduces the 2D k11/k22/k12 of anisotropic.py.
+
+TENSOR_COMPONENTS = ('kxx', 'kyy', 'kzz', 'kxy', 'kxz', 'kyz')
+_UPPER = (np.array([0, 1, 2, 0, 0, 1]), np.array([0, 1, 2, 1, 2, 2]))
+
+
+def rotation_matrices(dip, azimuth):
+    # (..., 3, 3) proper rotations (det +1) with columns dip direction,
+    # strike and bed normal; strike points 90 deg anticlockwise of the dip
+    # azimuth so that dip direction x strike = bed normal
+    d = np.radians(np.asarray(dip, dtype=float))
+    a = np.radians(np.asarray(azimuth, dtype=float))
+    d, a = np.broadcast_arrays(d, a)
+    sd, cd, sa, ca = np.sin(d), np.cos(d), np.sin(a), np.cos(a)
+    R = np.empty(d.shape + (3, 3))
+    R[..., 0, 0], R[..., 0, 1], R[..., 0, 2] = sa * cd, -ca, -sd * sa
+    R[..., 1, 0], R[..., 1, 1], R[..., 1, 2] = ca * cd, sa, -sd * ca
+    R[..., 2, 0], R[..., 2, 1], R[..., 2, 2] = sd, 0.0, cd
+    return R
+
+
+def rotate_tensor(kx, ky, kz, dip, azimuth):
+    # (..., 3, 3) permeability tensors; all inputs broadcast together
+    R = rotation_matrices(dip, azimuth)
+    k = np.stack(np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (kx, ky, kz))), axis=-1)
+    return np.einsum('...ij,...j,...kj->...ik', R, k, R, optimize=True)
+
+
+def iter_field_tensor(kx, ky, kz, dip, azimuth, chunk_size=250_000):
+    # Yields (start, block) with block the (cells, 6) components of
+    # TENSOR_COMPONENTS for cells start:start + len(block); inputs are
+    # flattened cell arrays or scalars
+    arrays = np.broadcast_arrays(*(np.ravel(np.asarray(v, dtype=float)) for v in (kx, ky, kz, dip, azimuth)))
+    n = len(arrays[0])
+    for start in range(0, n, chunk_size):
+        K = rotate_tensor(*(a[start:start + chunk_size] for a in arrays))
+        yield start, K[:, _UPPER[0], _UPPER[1]]
+
+
+def field_tensor(kx, ky, kz, dip, azimuth, chunk_size=250_000, out=None):
+    # (cells, 6) tensor components for a whole grid.  out may be any
+    # preallocated (cells, 6) array, e.g. a float32 np.memmap for grids
+    # that do not fit in memory; only one chunk is held in float64 at a time.
+    # A grid without cells gives a (0, 6) array.
+    if out is None:
+        n = np.broadcast(*(np.ravel(np.asarray(v)) for v in (kx, ky, kz, dip, azimuth))).size
+        out = np.empty((n, len(TENSOR_COMPONENTS)))
+    for start, block in iter_field_tensor(kx, ky, kz, dip, azimuth, chunk_size):
+        out[start:start + len(block)] = block
+    return out
+
+
+# Effective permeability along a wellpath.  For an infinitely long well
+# segment with direction w the pressure gradient lies in the plane normal
+# to w, and the equivalent isotropic permeability of that plane is
+#     k_eff = sqrt(det(K) * w^T K^-1 w) = sqrt(w^T adj(K) w)
+# which for horizontal bedding (K = diag(kh, kh, kt)) reduces to
+#     k_eff = sqrt(kh*kt*sin(inc)^2 + kh^2*cos(inc)^2)
+# kh is the permeability along the bedding and kt across it, as in
+# anisotropic.py.  Everything broadcasts, so arrays of shape (candidates,
+# stations) rank many well orientations in one call.
+def wellbore_direction(inc, azi=0.0):
+    # Unit vectors (..., 3) in grid axes (x east, y north, z down)
+    i = np.radians(np.asarray(inc, dtype=float))
+    a = np.radians(np.asarray(azi, dtype=float))
+    return np.stack(np.broadcast_arrays(np.sin(i) * np.sin(a), np.sin(i) * np.cos(a), np.cos(i)), axis=-1)
+
+
+def effective_permeability(inc, kh, kt, azi=0.0, dip=0.0, dip_azimuth=0.0):
+    # k_eff (md) normal to the wellbore at every station
+    w = wellbore_direction(inc, azi)
+    K = rotate_tensor(kh, kh, kt, dip, dip_azimuth)
+    a, b, c = K[..., 0, 0], K[..., 1, 1], K[..., 2, 2]
+    d, e, f = K[..., 0, 1], K[..., 0, 2], K[..., 1, 2]
+    wx, wy, wz = w[..., 0], w[..., 1], w[..., 2]
+    q = ((b * c - f * f) * wx * wx + (a * c - e * e) * wy * wy + (a * b - d * d) * wz * wz
+         + 2 * ((e * f - d * c) * wx * wy + (d * f - b * e) * wx * wz + (d * e - a * f) * wy * wz))
+    return np.sqrt(np.maximum(q, 0))
+
+
+def wellpath_productivity(md, inc, kh, kt, azi=0.0, dip=0.0, dip_azimuth=0.0, tvd=None, top=None, base=None):
+    # k_eff per station, its integral over MD inside the reservoir
+    # (kh_equivalent, md*ft; segments count when their mid-point TVD lies
+    # between top and base) and productivity_ratio, that integral over
+    # kh * thickness, i.e. the steady-state productivity relative to a
+    # vertical well through the same interval, ignoring the ln(re/rw) term.
+    # thickness is base - top, or the TVD (else MD) span of the path.
+    md = np.asarray(md, dtype=float)
+    k_eff = effective_permeability(inc, kh, kt, azi, dip, dip_azimuth)
+    segment = np.diff(md, axis=-1)
+    k_mid = (k_eff[..., 1:] + k_eff[..., :-1]) / 2
+    inside = np.ones(segment.shape, dtype=bool)
+    if tvd is not None:
+        tvd = np.asarray(tvd, dtype=float)
+        mid = (tvd[..., 1:] + tvd[..., :-1]) / 2
+        if top is not None:
+            inside &= mid >= top
+        if base is not None:
+            inside &= mid <= base
+    kh_equivalent = np.sum(np.where(inside, k_mid * segment, 0.0), axis=-1)
+
+    if top is not None and base is not None:
+        thickness = base - top
+    elif tvd is not None:
+        thickness = np.ptp(tvd, axis=-1)
+    else:
+        thickness = np.ptp(md, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = kh_equivalent / (np.asarray(kh, dtype=float) * thickness)
+    return {'k_eff': k_eff, 'kh_equivalent': kh_equivalent, 'productivity_ratio': ratio}
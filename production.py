@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from decline import split_wells
+
+# Streaming ingestion of long-format production histories (one row per well
+# and date).  Files are read in chunks; rows of a well must be contiguous,
+# as they are in the usual per-well monthly exports.  A well is emitted as
+# soon as the next well starts, the last (possibly incomplete) well of a
+# chunk is carried into the next one, so memory stays at about one chunk
+# regardless of file size.
+
+DAYS_PER_YEAR = 365.25
+
+
+def iter_chunks(source, chunksize=500_000, columns=None):
+    # DataFrame chunks of a CSV or Parquet file (Parquet needs pyarrow)
+    name = getattr(source, 'name', source)
+    if str(name).lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Reading Parquet production files requires pyarrow') from None
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=columns)
+
+
+def elapsed_years(dates):
+    # Dates (or date strings) as years since the first date
+    dates = pd.to_datetime(dates)
+    return ((dates - dates.min()) / pd.Timedelta(days=1)).to_numpy(dtype=float) / DAYS_PER_YEAR
+
+
+def _to_years(values):
+    # Numeric time columns are used as they are; dates become years since
+    # 1970 so that each well can be shifted to its own first production.
+    if pd.api.types.is_numeric_dtype(values):
+        return values, False
+    dates = pd.to_datetime(values)
+    return (dates - pd.Timestamp(0)) / pd.Timedelta(days=1) / DAYS_PER_YEAR, True
+
+
+def iter_wells(source, well_col='well_id', time_col='date', rate_col='rate', chunksize=500_000):
+    # Yields (well_id, t, q) per well, t in years since the well's first
+    # record when time_col holds dates.
+    carry = None
+    seen = set()
+    for chunk in iter_chunks(source, chunksize, [well_col, time_col, rate_col]):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        # The last run of rows may continue in the next chunk
+        wells = chunk[well_col].to_numpy()
+        changes = np.flatnonzero(wells[1:] != wells[:-1])
+        tail = changes[-1] + 1 if len(changes) else 0
+        carry = chunk.iloc[tail:]
+        yield from _emit(chunk.iloc[:tail], seen, well_col, time_col, rate_col)
+    if carry is not None:
+        yield from _emit(carry, seen, well_col, time_col, rate_col)
+
+
+def _emit(rows, seen, well_col, time_col, rate_col):
+    if rows.empty:
+        return
+    wells = rows[well_col].to_numpy()
+    for well_id in wells[np.r_[True, wells[1:] != wells[:-1]]]:
+        if well_id in seen:
+            raise ValueError(f'Rows of well {well_id} are not contiguous; sort the file by well first')
+        seen.add(well_id)
+    years, is_date = _to_years(rows[time_col])
+    rows = rows.assign(**{time_col: years})
+    for well_id, t, q in split_wells(rows, well_col, time_col, rate_col):
+        yield well_id, t - t[0] if is_date else t, q
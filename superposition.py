@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from welltest import analyze_table, bourdet_derivative, log_resample
+
+# Superposition for multi-rate well tests.  A rate history is a list of step
+# start times T_j (hours, T_0 = 0) and the rates q_j that start there.  For
+# radial flow every rate change ΔQ_j = q_j - q_{j-1} adds ΔQ_j * m*ln(t - T_j)
+# to the pressure change, so during flow period n
+#     X(t) = Σ_{j<=n} ΔQ_j/ΔQ_n * ln(t - T_j)
+# is the superposition time, and the Agarwal equivalent time
+#     ln te = X(t) - Σ_{j<n} ΔQ_j/ΔQ_n * ln(T_n - T_j)
+# turns the period into an equivalent single-rate drawdown (te -> Δt at the
+# start of the period, tp*Δt/(tp + Δt) for a buildup after one rate).  The
+# weighted log sums for all samples are one masked (samples x steps) array
+# expression, evaluated in chunks of samples to bound memory.
+
+
+def _steps(step_times, step_rates):
+    T = np.asarray(step_times, dtype=float)
+    q = np.asarray(step_rates, dtype=float)
+    dq = np.diff(q, prepend=0.0)
+    return T, q, dq
+
+
+def period_index(t, step_times):
+    # Flow period (index of the last step started at or before t) per sample
+    return np.searchsorted(np.asarray(step_times, dtype=float), np.asarray(t, dtype=float), side='right') - 1
+
+
+def _log_sum(t, T, dq, chunk_size):
+    # Σ_j ΔQ_j ln(t - T_j) over the steps started before t
+    out = np.empty(len(t))
+    for s in range(0, len(t), chunk_size):
+        dt = t[s:s + chunk_size, None] - T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[s:s + chunk_size] = np.sum(np.where(dt > 0, dq * np.log(np.where(dt > 0, dt, 1)), 0.0), axis=1)
+    return out
+
+
+def superposition_time(t, step_times, step_rates, chunk_size=100_000):
+    # X(t) in ln(hours) for every sample; NaN before the first step, at a
+    # step time itself and in periods without a rate change
+    t = np.asarray(t, dtype=float)
+    T, _, dq = _steps(step_times, step_rates)
+    n = period_index(t, T)
+    dq_n = np.where(n >= 0, dq[np.maximum(n, 0)], np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = _log_sum(t, T, dq, chunk_size) / dq_n
+    return np.where((n >= 0) & (t > T[np.maximum(n, 0)]) & (dq_n != 0), x, np.nan)
+
+
+def equivalent_time(t, step_times, step_rates, chunk_size=100_000):
+    # Agarwal equivalent time te (hours) for every sample
+    t = np.asarray(t, dtype=float)
+    T, _, dq = _steps(step_times, step_rates)
+    # Constant of every period: Σ_{j<n} ΔQ_j ln(T_n - T_j), from the same log sum at the step times
+    offset = _log_sum(T, T, dq, chunk_size)
+    n = np.maximum(period_index(t, T), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = superposition_time(t, T, step_rates, chunk_size) - offset[n] / dq[n]
+    return np.exp(x)
+
+
+def period_table(t, p, step_times, step_rates, period=-1, smoothing=0.1, points_per_cycle=20,
+                 chunk_size=100_000):
+    # Derivative table of one flow period (default: the last) on equivalent
+    # time, with the notebook's columns ('t (hours)' holds te and del_p the
+    # pressure change since the period started).  Returns the table and
+    # |ΔQ_n|, the rate to use as q in welltest.analyze_table.
+    t = np.asarray(t, dtype=float)
+    p = np.asarray(p, dtype=float)
+    T, _, dq = _steps(step_times, step_rates)
+    period = range(len(T))[period]
+    end = T[period + 1] if period + 1 < len(T) else np.inf
+    inside = (t > T[period]) & (t < end)
+    p_start = np.interp(T[period], t, p)
+    te = equivalent_time(t[inside], T, step_rates, chunk_size)
+    te_log, p_log = log_resample(te, p[inside], points_per_cycle)
+    del_p = np.abs(p_log - p_start)
+    table = pd.DataFrame({
+        't (hours)': te_log,
+        'pwf (psi)': p_log,
+        'del_p': del_p,
+        'ddp/dlnt': bourdet_derivative(te_log, del_p, smoothing),
+    })
+    return table, abs(dq[period])
+
+
+def analyze_periods(t, p, step_times, step_rates, Bo, vis, h, phi, ct, rw, periods=None, match=False,
+                    smoothing=0.1, points_per_cycle=20, chunk_size=100_000, **plateau):
+    # welltest.analyze_table of every flow period (default: all periods that
+    # start with a rate change), one row each with the period, its start
+    # time, rate and |ΔQ_n|.  A period that cannot be interpreted (no samples,
+    # no IARF plateau, ...) gets its error message instead of stopping the
+    # others, as in welltest.run_batch.
+    T, q, dq = _steps(step_times, step_rates)
+    if periods is None:
+        periods = np.flatnonzero(dq != 0)
+    rows = []
+    for n in periods:
+        row = {'period': n, 'start (hours)': T[n], 'rate': q[n], 'q': abs(dq[n])}
+        try:
+            table, q_n = period_table(t, p, T, q, n, smoothing, points_per_cycle, chunk_size)
+            row.update(analyze_table(table, q_n, Bo, vis, h, phi, ct, rw, match, **plateau))
+            row['error'] = None
+        except (ValueError, np.linalg.LinAlgError) as e:
+            row['error'] = f'{type(e).__name__}: {e}'
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# Minimum-curvature wellpaths from survey stations (MD, inclination, azimuth).
+# A survey table may hold many wells; read_survey sorts the stations by well
+# and MD, and minimum_curvature raises ValueError for stations that are not
+# grouped by well and sorted by MD.  All stations of all wells are processed as
+# one set of arrays: per-interval increments are computed together, zeroed
+# where a new well starts, and accumulated with a single cumulative sum that
+# is re-based at the first station of every well.
+
+_COLUMN_ALIASES = {
+    'md': 'md', 'measured depth': 'md', 'depth': 'md',
+    'inc': 'inc', 'incl': 'inc', 'inclination': 'inc',
+    'azi': 'azi', 'az': 'azi', 'azimuth': 'azi',
+    'well': 'well', 'well_id': 'well', 'wellname': 'well', 'well name': 'well',
+}
+
+
+def read_survey(path_or_buffer):
+    survey = pd.read_csv(path_or_buffer)
+    survey = survey.rename(columns=lambda c: _COLUMN_ALIASES.get(str(c).strip().lower(), c))
+    missing = {'md', 'inc', 'azi'} - set(survey.columns)
+    if missing:
+        raise ValueError(f'Survey file is missing column(s): {", ".join(sorted(missing))}')
+    order = ['well', 'md'] if 'well' in survey.columns else ['md']
+    return survey.sort_values(order, kind='stable', ignore_index=True)
+
+
+def minimum_curvature(md, inc, azi, well=None):
+    # Returns north, east, tvd (ft), dogleg (deg) and dls (deg/100 ft) per
+    # station.  The first station of each well is the tie-in point: it is
+    # placed at north = east = 0 and tvd = md (vertical above it).
+    md = np.asarray(md, dtype=float)
+    i = np.radians(np.asarray(inc, dtype=float))
+    a = np.radians(np.asarray(azi, dtype=float))
+
+    first = np.zeros(len(md), dtype=bool)
+    first[:1] = True
+    if well is not None:
+        well = np.asarray(well)
+        first[1:] = well[1:] != well[:-1]
+        if first.sum() != len(pd.unique(well)):
+            raise ValueError('Survey stations are not grouped by well; sort them by well and MD first')
+
+    dmd = np.diff(md)
+    if np.any(dmd[~first[1:]] < 0):
+        raise ValueError('Survey MD decreases within a well; sort the stations by MD first')
+
+    i1, i2, a1, a2 = i[:-1], i[1:], a[:-1], a[1:]
+    cos_dl = np.cos(i2 - i1) - np.sin(i1) * np.sin(i2) * (1 - np.cos(a2 - a1))
+    dl = np.arccos(np.clip(cos_dl, -1, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rf = np.where(dl > 1e-9, 2 / dl * np.tan(dl / 2), 1.0)
+        dls = np.where(dmd > 0, np.degrees(dl) * 100 / dmd, 0.0)
+
+    half = dmd / 2 * rf
+    d_north = half * (np.sin(i1) * np.cos(a1) + np.sin(i2) * np.cos(a2))
+    d_east = half * (np.sin(i1) * np.sin(a1) + np.sin(i2) * np.sin(a2))
+    d_tvd = half * (np.cos(i1) + np.cos(i2))
+
+    # Interval k ends at station k+1; intervals that start a new well carry
+    # no increment, the tie-in TVD is added back per well instead.
+    new = first[1:]
+    increments = np.zeros((3, len(md)))
+    increments[:, 1:] = np.where(new, 0.0, [d_north, d_east, d_tvd])
+    total = np.cumsum(increments, axis=1)
+    start = np.maximum.accumulate(np.where(first, np.arange(len(md)), 0))
+    pos = total - total[:, start]
+    pos[2] += md[start]
+
+    dogleg = np.zeros(len(md))
+    dogleg[1:] = np.where(new, 0.0, np.degrees(dl))
+    dls_out = np.zeros(len(md))
+    dls_out[1:] = np.where(new, 0.0, dls)
+    return {'north': pos[0], 'east': pos[1], 'tvd': pos[2], 'dogleg': dogleg, 'dls': dls_out}
+
+
+def vertical_section(north, east, azimuth):
+    # Horizontal departure projected on the vertical-section azimuth (deg)
+    az = np.radians(azimuth)
+    return np.asarray(north) * np.cos(az) + np.asarray(east) * np.sin(az)
+
+
+def compute_wellpath(survey):
+    # Adds north/east/tvd/dogleg/dls columns to a survey DataFrame
+    well = survey['well'].to_numpy() if 'well' in survey.columns else None
+    path = minimum_curvature(survey['md'].to_numpy(), survey['inc'].to_numpy(),
+                             survey['azi'].to_numpy(), well)
+    return survey.assign(**path)
@@ -0,0 +1,110 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import trajectory as traj
+
+# Build rate / KOP sensitivity sweeps.  The parameter grid is flattened and
+# cut into chunks of flat indices; each chunk unravels its own indices into
+# parameter values and is one vectorized call to the batch key-point
+# functions in trajectory.py, so the full grid is never materialized.  Only
+# the feasible plans of a chunk are kept.  Small grids run in-process,
+# larger ones are spread over a process pool one chunk per task.
+
+# Largest grid a sweep accepts (plans), about 120 MB of results when every
+# plan is feasible
+MAX_PLANS = 2_000_000
+
+
+def _build_hold_drop_chunk(args):
+    Vt, Ht, Ve, build_rate_1, build_rate_2, kop, a2 = args
+    p = traj.build_hold_drop_points(kop, Vt, Ht, Ve, build_rate_1, build_rate_2, a2)
+    return {
+        'hold_inclination': p['a1'],
+        'md_to_target': p['MDt'],
+        'max_dogleg': np.where(p['feasible'], np.maximum(build_rate_1, build_rate_2), np.nan),
+        'feasible': p['feasible'],
+    }
+
+
+def _horizontal_double_chunk(args):
+    Vt, Ht, L, build_rate_1, kop, a1 = args
+    p = traj.horizontal_double_points(kop, Vt, Ht, L, a1, build_rate_1)
+    return {
+        'build_rate_2': p['build_rate_2'],
+        'md_to_target': p['MDt'],
+        'max_dogleg': np.where(p['feasible'], np.maximum(build_rate_1, p['build_rate_2']), np.nan),
+        'feasible': p['feasible'],
+    }
+
+
+def _chunk(args):
+    func, fixed, names, values, start, stop = args
+    index = np.unravel_index(np.arange(start, stop), [len(v) for v in values])
+    grid = [v[i] for v, i in zip(values, index)]
+    result = func(tuple(fixed) + tuple(grid))
+    keep = result.pop('feasible')
+    chunk = {name: g[keep] for name, g in zip(names, grid)}
+    chunk.update({key: r[keep] for key, r in result.items()})
+    return chunk
+
+
+def _run(func, fixed, axes, workers, chunk_size, max_plans):
+    names = list(axes)
+    values = [np.asarray(axes[n], dtype=float).ravel() for n in names]
+    n = 1
+    for v in values:
+        n *= len(v)
+    if n > max_plans:
+        raise ValueError(f'{n:,} plans exceed the sweep budget of {max_plans:,}; use fewer grid steps')
+    tasks = ((func, fixed, names, values, s, min(s + chunk_size, n)) for s in range(0, max(n, 1), chunk_size))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    results = []
+    if workers > 1 and n > chunk_size:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_chunk, task))
+                if len(pending) >= 2 * workers:
+                    results.append(pending.popleft().result())
+            while pending:
+                results.append(pending.popleft().result())
+    else:
+        results = [_chunk(t) for t in tasks]
+
+    # Column by column, releasing the chunk arrays as they are joined
+    columns = {key: np.concatenate([r.pop(key) for r in results]) for key in list(results[0])}
+    return pd.DataFrame(columns, copy=False)
+
+
+def sweep_build_hold_drop(Vt, Ht, Ve, build_rate_1, build_rate_2, kop, a2, workers=None, chunk_size=50_000,
+                          max_plans=MAX_PLANS):
+    # One row per feasible combination of the build_rate_1, build_rate_2,
+    # kop and a2 (inclination after drop) arrays, with the hold inclination,
+    # MD to target and max dogleg (deg/100 ft) of the plan.  Grids of more
+    # than max_plans combinations raise ValueError.
+    axes = {'build_rate_1': build_rate_1, 'build_rate_2': build_rate_2, 'kop': kop, 'a2': a2}
+    return _run(_build_hold_drop_chunk, (Vt, Ht, Ve), axes, workers, chunk_size, max_plans)
+
+
+def sweep_horizontal_double(Vt, Ht, L, build_rate_1, kop, a1, workers=None, chunk_size=50_000,
+                            max_plans=MAX_PLANS):
+    # Same for the Horizontal Double Buildup profile over build_rate_1, kop
+    # and a1 (hold inclination of the first build); the second build rate
+    # is solved per plan.
+    axes = {'build_rate_1': build_rate_1, 'kop': kop, 'a1': a1}
+    return _run(_horizontal_double_chunk, (Vt, Ht, L), axes, workers, chunk_size, max_plans)
+
+
+def best_plans(table, x, y, value='md_to_target'):
+    # Shortest plan for every (x, y) pair of a sweep table, as a pivot table
+    # of its value column ready for a heatmap (rows y, columns x).  By
+    # default the MD to target itself; e.g. 'hold_inclination' gives the
+    # hold inclination of the same shortest plans.
+    shortest = table.loc[table.groupby([y, x])['md_to_target'].idxmin()]
+    return shortest.pivot(index=y, columns=x, values=value)
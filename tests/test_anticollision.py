@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+import anticollision
+
+
+def _brute_force(reference, offsets, scan_radius, error_rate):
+    # Every reference station against every station of every offset well
+    rows = []
+    ref_xyz = np.column_stack((reference['north'], reference['east'], reference['tvd']))
+    for k, md in enumerate(reference['md']):
+        for well, group in offsets.groupby('well'):
+            xyz = group[['north', 'east', 'tvd']].to_numpy()
+            dist = np.sqrt(((xyz - ref_xyz[k]) ** 2).sum(axis=1))
+            n = np.argmin(dist)
+            if dist[n] < scan_radius:
+                offset_md = group['md'].iloc[n]
+                rows.append((md, well, offset_md, dist[n], dist[n] / (error_rate / 1000 * (md + offset_md))))
+    return pd.DataFrame(rows, columns=['md', 'well', 'offset_md', 'distance', 'separation_factor'])
+
+
+def _well(rng, name, start, n):
+    md = np.cumsum(rng.uniform(20, 60, n))
+    step = rng.normal(0, 1, (n, 3)) * 30 + [10, 5, 25]
+    xyz = start + np.cumsum(step, axis=0)
+    return pd.DataFrame({'well': name, 'md': md, 'north': xyz[:, 0], 'east': xyz[:, 1], 'tvd': xyz[:, 2]})
+
+
+def test_scan_matches_brute_force():
+    rng = np.random.default_rng(7)
+    reference = _well(rng, 'REF', [0, 0, 0], 150)
+    offsets = pd.concat([
+        _well(rng, 'B', [300, 0, 0], 120),
+        _well(rng, 'A', [-200, 400, 500], 90),
+        _well(rng, 'FAR', [50_000, 50_000, 0], 80),
+    ])
+    # Stations of a well need not be contiguous
+    offsets = offsets.sample(frac=1, random_state=1)
+
+    table = anticollision.scan(reference, offsets, scan_radius=800, error_rate=2.5)
+    expected = _brute_force(reference, offsets, 800, 2.5)
+    assert len(table) == len(expected) > 0
+    assert 'FAR' not in set(table['well'])
+    pd.testing.assert_frame_equal(table.sort_values(['md', 'well'], ignore_index=True),
+                                  expected.sort_values(['md', 'well'], ignore_index=True),
+                                  check_dtype=False, rtol=1e-12)
+
+    closest = anticollision.summary(table).set_index('well')
+    for well, group in expected.groupby('well'):
+        assert closest.loc[well, 'distance'] == group['distance'].min()
+        assert closest.loc[well, 'min_separation_factor'] == group['separation_factor'].min()
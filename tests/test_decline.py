@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from scipy.integrate import quad
+from scipy.optimize import curve_fit
+
+from decline import (FitCache, cumulative_modified_hyperbolic, eur, fit_decline_model, fit_decline_model_robust,
+                     fit_well, fit_well_stream, hyperbolic_decline, modified_hyperbolic, segmented_forecast,
+                     switch_time)
+
+T = np.arange(36) / 12
+Q = 1000 / (1 + 0.5 * 1.2 * T) ** (1 / 0.5)
+
+
+def test_fit_well_shut_in_well_robust():
+    rows = fit_well(T, np.zeros_like(T), robust=True)
+    assert [row['model'] for row in rows] == ['Exponential', 'Harmonic', 'Hyperbolic']
+    for row in rows:
+        assert np.isnan(row['qi']) and np.isnan(row['di']) and np.isnan(row['r2'])
+
+
+def test_fit_well_too_few_records():
+    rows = fit_well(T[:2], Q[:2])
+    hyperbolic = rows[2]
+    assert np.isnan(hyperbolic['qi']) and np.isnan(hyperbolic['r2'])
+
+
+def test_fit_well_stream_with_shut_in_well():
+    wells = [('A', T, Q), ('SHUT', T, np.zeros_like(T)), ('B', T, 0.5 * Q)]
+    params = fit_well_stream(wells, workers=1, robust=True)
+    assert params['well_id'].nunique() == 3
+    shut = params[params['well_id'] == 'SHUT']
+    assert shut[['qi', 'di', 'r2']].isna().all().all()
+    fitted = params[params['well_id'] != 'SHUT']
+    assert np.allclose(fitted.loc[fitted['model'] == 'Hyperbolic', 'b'], 0.5, atol=1e-3)
+
+
+def test_fit_well_stream_one_best_model_per_well():
+    # Identical exponential data: the exponential and hyperbolic fits tie
+    q = 1000 * np.exp(-0.8 * T)
+    wells = [('A', T, q), ('ZERO', T, np.zeros_like(T)), ('B', T, Q)]
+    params = fit_well_stream(wells, workers=1)
+    best = params[params['best']]
+    assert sorted(best['well_id']) == ['A', 'B']
+    assert not params.loc[params['well_id'] == 'ZERO', 'best'].any()
+
+
+def test_robust_covariance_matches_least_squares_for_linear_loss():
+    rng = np.random.default_rng(3)
+    q = Q * rng.lognormal(0, 0.03, len(Q))
+    params, cov = fit_decline_model(T, q, hyperbolic_decline, return_cov=True)
+    robust_params, robust_cov = fit_decline_model_robust(T, q, hyperbolic_decline, loss='linear', return_cov=True)
+    assert np.allclose(robust_params, params, rtol=1e-3)
+    assert np.allclose(robust_cov, cov, rtol=1e-2)
+
+
+def test_hyperbolic_fit_matches_curve_fit():
+    # b is fitted through a change of variable; parameters and covariance
+    # are reported for b itself
+    rng = np.random.default_rng(4)
+    q = 800 / (1 + 2.5 * 0.9 * T) ** (1 / 2.5) * rng.lognormal(0, 0.03, len(T))
+    params, cov = fit_decline_model(T, q, hyperbolic_decline, return_cov=True)
+    reference, reference_cov = curve_fit(hyperbolic_decline, T, q, p0=[800, 0.9, 2.5])
+    assert np.allclose(params, reference, rtol=1e-4)
+    assert np.allclose(cov, reference_cov, rtol=1e-2)
+
+
+def test_fit_cache_directory(tmp_path):
+    cache = FitCache(directory=str(tmp_path))
+    key = FitCache.key(T, Q, hyperbolic_decline)
+    cache.put(key, [1000, 1.2, 0.5], 0.99)
+    assert [p.name for p in tmp_path.iterdir()] == [key + '.npz']
+    params, r2 = FitCache(directory=str(tmp_path)).get(key)
+    assert np.allclose(params, [1000, 1.2, 0.5]) and r2 == 0.99
+
+    # A truncated entry, e.g. from a crashed writer, is a miss
+    path = tmp_path / (key + '.npz')
+    path.write_bytes(path.read_bytes()[:20])
+    assert FitCache(directory=str(tmp_path)).get(key) is None
+
+
+def _arps(t, qi, di, b):
+    return qi * np.exp(-di * t) if b == 0 else qi / (1 + b * di * t) ** (1 / b)
+
+
+def test_segmented_forecast_rates_and_cumulatives():
+    segments = [(1.0, 1.2, 0.8), (2.0, 0.5, 0.0), (np.inf, 0.3, 1.0)]
+    t = np.array([0.0, 0.5, 1.0, 2.2, 3.0, 7.5])
+    rate, cum = segmented_forecast(t, 1000.0, segments)
+
+    q1 = _arps(1.0, 1000.0, 1.2, 0.8)
+    q2 = _arps(2.0, q1, 0.5, 0.0)
+    expected = [1000.0, _arps(0.5, 1000.0, 1.2, 0.8), q1, _arps(1.2, q1, 0.5, 0.0), q2, _arps(4.5, q2, 0.3, 1.0)]
+    np.testing.assert_allclose(rate, expected, rtol=1e-12)
+
+    def segmented_rate(s):
+        if s < 1:
+            return _arps(s, 1000.0, 1.2, 0.8)
+        if s < 3:
+            return _arps(s - 1, q1, 0.5, 0.0)
+        return _arps(s - 3, q2, 0.3, 1.0)
+
+    reference = [quad(segmented_rate, 0, x, points=[1, 3] if x > 3 else None, epsrel=1e-13)[0] for x in t]
+    np.testing.assert_allclose(cum, reference, rtol=1e-10)
+
+
+def test_modified_hyperbolic_cumulative_and_switch():
+    qi, di, b, dmin = 800.0, 1.5, 1.2, 0.08
+    t_sw = switch_time(di, b, dmin)
+    assert di / (1 + b * di * t_sw) == pytest.approx(dmin)
+    t = np.array([0.0, 1.0, t_sw, 15.0, 40.0])
+    rate = modified_hyperbolic(t, qi, di, b, dmin)
+    q_sw = _arps(t_sw, qi, di, b)
+    np.testing.assert_allclose(rate, [qi, _arps(1.0, qi, di, b), q_sw, q_sw * np.exp(-dmin * (15 - t_sw)),
+                                      q_sw * np.exp(-dmin * (40 - t_sw))], rtol=1e-12)
+
+    reference = [quad(lambda s: float(modified_hyperbolic(s, qi, di, b, dmin)), 0, x,
+                      points=[t_sw] if x > t_sw else None, epsrel=1e-13)[0] for x in t]
+    np.testing.assert_allclose(cumulative_modified_hyperbolic(qi, di, b, dmin, t), reference, rtol=1e-10)
+
+    # EUR to an economic limit on the exponential tail
+    total, t_end = eur(qi, di, b, dmin, q_limit=5.0)
+    assert float(modified_hyperbolic(t_end, qi, di, b, dmin)) == pytest.approx(5.0)
+    assert total == pytest.approx(quad(lambda s: float(modified_hyperbolic(s, qi, di, b, dmin)), 0, t_end,
+                                       points=[t_sw], epsrel=1e-13)[0], rel=1e-10)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import permeability as perm
+
+
+@pytest.fixture
+def orientations():
+    rng = np.random.default_rng(23)
+    return rng.uniform(0, 90, 200), rng.uniform(0, 360, 200)
+
+
+def test_rotation_matrices_are_proper_rotations(orientations):
+    R = perm.rotation_matrices(*orientations)
+    np.testing.assert_allclose(np.linalg.det(R), 1.0, rtol=1e-12)
+    np.testing.assert_allclose(R @ np.swapaxes(R, -1, -2), np.broadcast_to(np.eye(3), R.shape), atol=1e-12)
+
+
+def test_rotation_columns():
+    # Dip 30 deg towards the east (azimuth 90): dip direction down to the
+    # east, strike horizontal north-south, bed normal tilted west
+    R = perm.rotation_matrices(30.0, 90.0)
+    s, c = np.sin(np.radians(30)), np.cos(np.radians(30))
+    np.testing.assert_allclose(R[:, 0], [c, 0, s], atol=1e-15)
+    np.testing.assert_allclose(R[:, 1], [0, 1, 0], atol=1e-15)
+    np.testing.assert_allclose(R[:, 2], [-s, 0, c], atol=1e-15)
+
+
+def test_rotated_tensor_eigen_decomposition(orientations):
+    dip, azimuth = orientations
+    kx, ky, kz = 300.0, 120.0, 15.0
+    K = perm.rotate_tensor(kx, ky, kz, dip, azimuth)
+    np.testing.assert_allclose(K, np.swapaxes(K, -1, -2), atol=1e-12)
+    np.testing.assert_allclose(np.linalg.eigvalsh(K), np.broadcast_to([kz, ky, kx], (len(dip), 3)), rtol=1e-12)
+    # Each principal permeability acts along its column of R
+    R = perm.rotation_matrices(dip, azimuth)
+    for j, k in enumerate((kx, ky, kz)):
+        np.testing.assert_allclose(np.einsum('nij,nj->ni', K, R[:, :, j]), k * R[:, :, j], atol=1e-10)
+
+
+def test_flat_bedding_tensor():
+    # Azimuth 0: kx along north (y), ky along east (x), kz vertical
+    np.testing.assert_allclose(perm.rotate_tensor(300.0, 120.0, 15.0, 0.0, 0.0), np.diag([120.0, 300.0, 15.0]),
+                               atol=1e-12)
+
+
+def test_field_tensor_chunks_and_empty_grid(orientations):
+    dip, azimuth = orientations
+    kx = np.linspace(100, 400, len(dip))
+    full = perm.rotate_tensor(kx, 0.5 * kx, 20.0, dip, azimuth)
+    components = perm.field_tensor(kx, 0.5 * kx, 20.0, dip, azimuth, chunk_size=7)
+    rows, cols = zip(*[('xyz'.index(name[1]), 'xyz'.index(name[2])) for name in perm.TENSOR_COMPONENTS])
+    np.testing.assert_array_equal(components, full[:, rows, cols])
+    assert perm.field_tensor([], [], [], [], []).shape == (0, len(perm.TENSOR_COMPONENTS))
+
+
+def test_effective_permeability_flat_bedding():
+    inc = np.linspace(0, 90, 19)
+    kh, kt = 200.0, 20.0
+    s, c = np.sin(np.radians(inc)), np.cos(np.radians(inc))
+    np.testing.assert_allclose(perm.effective_permeability(inc, kh, kt, azi=37.0),
+                               np.sqrt(kh * kt * s ** 2 + kh ** 2 * c ** 2), rtol=1e-12)
+
+
+def test_effective_permeability_matches_inverse_tensor(orientations):
+    # k_eff = sqrt(det(K) w^T K^-1 w) with the tensor inverted numerically
+    dip, azimuth = orientations
+    rng = np.random.default_rng(5)
+    inc, azi = rng.uniform(0, 90, len(dip)), rng.uniform(0, 360, len(dip))
+    K = perm.rotate_tensor(200.0, 200.0, 20.0, dip, azimuth)
+    w = perm.wellbore_direction(inc, azi)
+    reference = np.sqrt(np.linalg.det(K) * np.einsum('ni,ni->n', w, np.linalg.solve(K, w[..., None])[..., 0]))
+    np.testing.assert_allclose(perm.effective_permeability(inc, 200.0, 20.0, azi, dip, azimuth), reference,
+                               rtol=1e-12)
@@ -0,0 +1,54 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from production import DAYS_PER_YEAR, iter_wells
+
+
+def _history():
+    # Wells of 1 to 9 monthly records, contiguous, rates unsorted in time
+    # inside well C
+    rows = []
+    for well, n in [('A', 1), ('B', 9), ('C', 4), ('D', 2), ('E', 7)]:
+        dates = pd.date_range('2019-03-01', periods=n, freq='MS')
+        if well == 'C':
+            dates = dates[::-1]
+        rows += [(well, d.strftime('%Y-%m-%d'), 100.0 * (k + 1) + ord(well)) for k, d in enumerate(dates)]
+    return pd.DataFrame(rows, columns=['well_id', 'date', 'rate'])
+
+
+def _csv(table):
+    return io.StringIO(table.to_csv(index=False))
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 3, 5, 8, 100])
+def test_iter_wells_chunk_carry_over(chunksize):
+    table = _history()
+    wells = list(iter_wells(_csv(table), chunksize=chunksize))
+    assert [w for w, _, _ in wells] == ['A', 'B', 'C', 'D', 'E']
+    for well_id, t, q in wells:
+        rows = table[table['well_id'] == well_id].assign(date=lambda x: pd.to_datetime(x['date']))
+        rows = rows.sort_values('date')
+        expected_t = (rows['date'] - rows['date'].iloc[0]).dt.days.to_numpy() / DAYS_PER_YEAR
+        np.testing.assert_allclose(t, expected_t, rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(q, rows['rate'].to_numpy())
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 4, 100])
+def test_iter_wells_non_contiguous_well(chunksize):
+    table = _history()
+    # A second block of B after C, also within a single chunk
+    table = pd.concat([table, table[table['well_id'] == 'B'].head(2)], ignore_index=True)
+    with pytest.raises(ValueError, match='Rows of well B are not contiguous'):
+        list(iter_wells(_csv(table), chunksize=chunksize))
+
+
+def test_iter_wells_numeric_time_unchanged():
+    table = pd.DataFrame({'well_id': ['A', 'A', 'B'], 'date': [0.5, 0.25, 2.0], 'rate': [3.0, 4.0, 5.0]})
+    wells = list(iter_wells(_csv(table), chunksize=2))
+    assert [w for w, _, _ in wells] == ['A', 'B']
+    np.testing.assert_array_equal(wells[0][1], [0.25, 0.5])
+    np.testing.assert_array_equal(wells[0][2], [4.0, 3.0])
+    np.testing.assert_array_equal(wells[1][1], [2.0])
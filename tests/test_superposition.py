@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from superposition import analyze_periods, equivalent_time, superposition_time
+
+ROCK = {'Bo': 1.3, 'vis': 0.5, 'h': 50.0, 'phi': 0.2, 'ct': 1.6e-5, 'rw': 0.35}
+
+
+def test_equivalent_time_of_buildup_is_agarwal():
+    tp = 24.0
+    dt = np.logspace(-3, 2, 51)
+    te = equivalent_time(np.concatenate(([6.0, tp], tp + dt)), [0.0, tp], [500.0, 0.0])
+    assert te[0] == pytest.approx(6.0, rel=1e-12)
+    np.testing.assert_allclose(te[2:], tp * dt / (tp + dt), rtol=1e-10)
+
+
+def test_superposition_time_matches_definition():
+    T = np.array([0.0, 10.0, 25.0, 40.0])
+    rates = np.array([300.0, 700.0, 100.0, 0.0])
+    dq = np.diff(rates, prepend=0.0)
+    t = np.array([0.5, 10.5, 24.0, 30.0, 40.001, 90.0])
+    x = superposition_time(t, T, rates)
+    for k, tk in enumerate(t):
+        n = np.searchsorted(T, tk, side='right') - 1
+        assert x[k] == pytest.approx(sum(dq[j] / dq[n] * np.log(tk - T[j]) for j in range(n + 1)), rel=1e-12)
+
+
+def test_analyze_periods_semilog_drawdown_and_buildup():
+    # Every rate change adds dq (a ln dt + b) to the pressure drop, a and b
+    # from the semi-log line of k and skin; on equivalent time the buildup
+    # is the same straight line as the drawdown
+    k, skin, q, tp = 20.0, 2.0, 500.0, 24.0
+    m = 162.6 * ROCK['vis'] * ROCK['Bo'] / (k * ROCK['h'])
+    diffusivity = k / (ROCK['phi'] * ROCK['vis'] * ROCK['ct'] * ROCK['rw'] ** 2)
+
+    def unit_drop(dt):
+        return m * (np.log10(dt) + np.log10(diffusivity) - 3.23 + skin / 1.151)
+
+    # The gauge starts at the initial pressure
+    t = np.concatenate(([0.0], np.logspace(-2, np.log10(tp), 400), tp + np.logspace(-2, 2, 400)))
+    p = np.full(len(t), 5000.0)
+    p[1:] -= q * unit_drop(t[1:])
+    after = t > tp
+    p[after] += q * unit_drop(t[after] - tp)
+
+    result = analyze_periods(t, p, [0.0, tp], [q, 0.0], **ROCK)
+    assert list(result['period']) == [0, 1] and result['error'].isna().all()
+    np.testing.assert_allclose(result['q'], q)
+    np.testing.assert_allclose(result['k_semilog'], k, rtol=1e-9)
+    np.testing.assert_allclose(result['skin_semilog'], skin, rtol=1e-9)
+
+
+def test_analyze_periods_reports_uninterpretable_periods():
+    t = np.linspace(0.01, 10, 200)
+    result = analyze_periods(t, 5000 - 10 * np.log(t), [0.0, 5.0, 20.0], [500.0, 200.0, 0.0], **ROCK)
+    # No samples in the last period
+    assert result['error'].iloc[-1].startswith('ValueError')
@@ -0,0 +1,65 @@
+import io
+import math
+
+import numpy as np
+import pytest
+
+import survey
+
+
+def test_read_survey_sorts_by_well_and_md():
+    csv = io.StringIO('Well,MD,Inc,Azi\nB,0,0,0\nA,200,10,90\nB,100,5,45\nA,0,0,0\nA,100,5,90\n')
+    table = survey.read_survey(csv)
+    assert list(table['well']) == ['A', 'A', 'A', 'B', 'B']
+    assert list(table['md']) == [0, 100, 200, 0, 100]
+
+
+def test_minimum_curvature_rejects_unsorted_stations():
+    with pytest.raises(ValueError, match='MD decreases'):
+        survey.minimum_curvature([0, 200, 100], [0, 10, 5], [0, 0, 0])
+    with pytest.raises(ValueError, match='not grouped'):
+        survey.minimum_curvature([0, 100, 0, 200], [0, 5, 0, 10], [0, 0, 0, 0], well=['A', 'A', 'B', 'A'])
+    # A new well may restart at a lower MD
+    path = survey.minimum_curvature([0, 100, 0, 200], [0, 5, 0, 10], [0, 0, 0, 0], well=['A', 'A', 'B', 'B'])
+    assert np.allclose(path['tvd'][[0, 2]], 0)
+
+
+def _minimum_curvature_loop(md, inc, azi, well):
+    # Station-by-station textbook minimum curvature
+    out = np.zeros((5, len(md)))
+    for k in range(len(md)):
+        if k == 0 or well[k] != well[k - 1]:
+            out[:, k] = 0, 0, md[k], 0, 0
+            continue
+        i1, i2 = math.radians(inc[k - 1]), math.radians(inc[k])
+        a1, a2 = math.radians(azi[k - 1]), math.radians(azi[k])
+        dmd = md[k] - md[k - 1]
+        dl = math.acos(min(1.0, math.cos(i2 - i1) - math.sin(i1) * math.sin(i2) * (1 - math.cos(a2 - a1))))
+        rf = 2 / dl * math.tan(dl / 2) if dl > 1e-9 else 1.0
+        half = dmd / 2 * rf
+        out[0, k] = out[0, k - 1] + half * (math.sin(i1) * math.cos(a1) + math.sin(i2) * math.cos(a2))
+        out[1, k] = out[1, k - 1] + half * (math.sin(i1) * math.sin(a1) + math.sin(i2) * math.sin(a2))
+        out[2, k] = out[2, k - 1] + half * (math.cos(i1) + math.cos(i2))
+        out[3, k] = math.degrees(dl)
+        out[4, k] = math.degrees(dl) * 100 / dmd if dmd > 0 else 0.0
+    return out
+
+
+def test_minimum_curvature_matches_loop():
+    rng = np.random.default_rng(6)
+    wells, md, inc, azi = [], [], [], []
+    for w, n in enumerate([1, 40, 200, 75]):
+        wells += [w] * n
+        md.append(500 * w + np.cumsum(rng.uniform(0, 100, n)))
+        inc.append(np.clip(np.cumsum(rng.normal(1, 2, n)), 0, 120))
+        azi.append(np.cumsum(rng.normal(0, 5, n)) % 360)
+    md, inc, azi = np.concatenate(md), np.concatenate(inc), np.concatenate(azi)
+    # Straight stretches (dogleg 0) and a repeated station (zero course length)
+    inc[50:60], azi[50:60] = 30.0, 120.0
+    md[100] = md[99]
+
+    path = survey.minimum_curvature(md, inc, azi, wells)
+    reference = _minimum_curvature_loop(md, inc, azi, wells)
+    # Within 1e-12 of the largest value of each column
+    for k, name in enumerate(['north', 'east', 'tvd', 'dogleg', 'dls']):
+        np.testing.assert_allclose(path[name], reference[k], rtol=0, atol=1e-12 * np.abs(reference[k]).max())
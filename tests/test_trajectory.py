@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+from scipy.integrate import quad
+
+import trajectory as traj
+
+
+def test_slanted_infeasible_target_behind_slant():
+    plan = traj.slanted(1000, 10000, 2000, 30, 1.5)
+    assert not plan['feasible']
+    assert np.isnan(plan['a2'])
+
+
+def test_slanted_feasible():
+    plan = traj.slanted(1000, 10000, 12000, 30, 1.5)
+    assert plan['feasible']
+    md = plan['stations']['md']
+    assert np.all(np.diff(md) > 0)
+    assert 0 < plan['a2'] and plan['at'] < 90
+
+
+def test_horizontal_single_infeasible_kop_above_surface():
+    plan = traj.horizontal_single(1000, 12000, 2000)
+    assert not plan['feasible']
+    assert np.isnan(plan['r'])
+
+
+def test_horizontal_single_points_batch():
+    p = traj.horizontal_single_points([13000, 1000, 9000], [12000, 12000, 1000], [2000, 2000, 2000])
+    assert list(p['feasible']) == [True, False, False]
+    assert np.isclose(p['MDt'][0], 3000 + 10000 * np.pi / 2 + 2000)
+
+
+# CD and r2 from the SymPy solve of the original Horizontal Double Buildup
+# page, for the closed form in horizontal_double_points
+HORIZONTAL_DOUBLE_REFERENCE = [
+    # (Vb, Vt, Ht, L, a1, build_rate_1), (CD, r2)
+    ((1000, 10000, 16000, 2000, 60, 1.5), (9152.791888852922, 8327.18078319694)),
+    ((2000, 8000, 14700, 9700, 30, 3.0), (3994.19078998526, 3171.999299519116)),
+    ((500, 9000, 12000, 3000, 45, 2.0), (7469.39185746432, 4071.895756840679)),
+    # a1 = 89.9: determinant 1 - sin(a1) of about 1.5e-6
+    ((1000, 2919.856408221396, 11406.525985461729, 1500, 89.9, 3.0), (3459.152993716062, 2601718.0283075147)),
+]
+
+
+@pytest.mark.parametrize('args, expected', HORIZONTAL_DOUBLE_REFERENCE)
+def test_horizontal_double_points_matches_sympy(args, expected):
+    p = traj.horizontal_double_points(*args)
+    assert p['feasible']
+    assert np.allclose([p['CD'], p['r2']], expected, rtol=1e-9)
+
+
+def test_horizontal_double_points_singular():
+    # a1 = 90: SymPy finds no solution, the closed form flags the plan
+    p = traj.horizontal_double_points(1000, 10000, 16000, 2000, 90, 1.5)
+    assert not p['feasible']
+    assert np.isnan(p['CD']) and np.isnan(p['r2'])
+
+
+def test_horizontal_double_points_batch_matches_scalar():
+    args = np.array([a for a, _ in HORIZONTAL_DOUBLE_REFERENCE], dtype=float).T
+    p = traj.horizontal_double_points(*args)
+    assert np.allclose(p['CD'], [cd for _, (cd, _) in HORIZONTAL_DOUBLE_REFERENCE], rtol=1e-9)
+
+
+def test_horizontal_double_first_build_past_horizontal_infeasible():
+    plan = traj.horizontal_double(720.8, 2543.4, 875.2, 2969.9, 93.49, 0.5186)
+    assert not plan['feasible']
+    a1 = np.linspace(90.01, 179.99, 500)
+    p = traj.horizontal_double_points(720.8, 2543.4, 875.2, 2969.9, a1, 0.5186)
+    assert not p['feasible'].any()
+
+
+def test_horizontal_double_feasible_plans_have_increasing_md():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    p = traj.horizontal_double_points(rng.uniform(0, 5000, n), rng.uniform(1000, 15000, n),
+                                      rng.uniform(0, 20000, n), rng.uniform(0, 10000, n),
+                                      rng.uniform(0, 180, n), rng.uniform(0.1, 10, n))
+    feasible = p['feasible']
+    assert feasible.sum() > 100
+    md = np.column_stack([p[k][feasible] for k in ('MDc', 'MDd', 'MDe', 'MDt')])
+    assert np.all(np.diff(md, axis=1) >= 0)
+    assert np.all(p['a2'][feasible] > 0)
+
+
+def _integrated(st, md):
+    # TVD and horizontal displacement at md by quadrature of the linearly
+    # interpolated inclination, independent of the closed forms
+    breaks = st['md'][(st['md'] > 0) & (st['md'] < md)]
+
+    def along(f):
+        return quad(lambda s: f(np.radians(np.interp(s, st['md'], st['inc']))), 0, md, points=list(breaks) or None,
+                    epsabs=1e-9, epsrel=1e-12, limit=200)[0]
+    return along(np.cos), along(np.sin)
+
+
+def test_trajectory_at_md_matches_quadrature():
+    st = traj.build_hold_drop(2000, 15000, 11800, 13000, 3.0, 2.0, 20.0)['stations']
+    # Every station plus points inside each section
+    md = np.sort(np.concatenate([st['md'], [1500, 2800, 9000, 17000, 19000]]))
+    path = traj.Trajectory(st).at_md(md)
+    for k, m in enumerate(md):
+        tvd, h = _integrated(st, m)
+        assert path['tvd'][k] == pytest.approx(tvd, abs=1e-6)
+        assert path['h'][k] == pytest.approx(h, abs=1e-6)
+    assert np.allclose(path['inc'], np.interp(md, st['md'], st['inc']))
+    assert np.allclose(path[[0, -1]]['tvd'], [0, 15000]) and np.isclose(path['h'][-1], 11800)
+
+
+def test_trajectory_at_md_outside_profile_is_nan():
+    well = traj.Trajectory(traj.build_hold(1000, 10000, 6000, 1.5)['stations'])
+    path = well.at_md([-1.0, well.total_md + 1.0])
+    assert np.isnan(path['tvd']).all() and np.isnan(path['h']).all() and np.isnan(path['inc']).all()
+
+
+def test_trajectory_md_at_tvd_inverts_at_md():
+    well = traj.Trajectory(traj.build_hold_drop(2000, 15000, 11800, 13000, 3.0, 2.0, 20.0)['stations'])
+    md = np.linspace(0, well.total_md, 101)
+    assert np.allclose(well.md_at_tvd(well.at_md(md)['tvd']), md, rtol=0, atol=1e-6)
+    assert np.isnan(well.md_at_tvd([-10.0, 15000.5])).all()
+
+
+def test_trajectory_md_at_tvd_first_md_on_horizontal():
+    # The lateral keeps the target TVD; its first MD is the end of the arc
+    well = traj.Trajectory(traj.horizontal_single(13000, 12000, 2000)['stations'])
+    assert well.md_at_tvd(13000) == pytest.approx(3000 + 10000 * np.pi / 2)
+    assert well.md_at_tvd(3000 + 10000 * np.sin(np.radians(30))) == pytest.approx(3000 + 10000 * np.pi / 6)
+    assert well.at_tvd(1500)['md'] == pytest.approx(1500)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from typecurve import rate_matrix, rate_matrix_stream, type_curve
+
+
+def _history():
+    rng = np.random.default_rng(0)
+    n, months = 40, 24
+    first = np.datetime64('2020-01', 'M') + rng.integers(0, 12, n)
+    rate = rng.uniform(10, 100, n * months)
+    rate[rng.random(rate.size) < 0.1] = 0.0
+    table = pd.DataFrame({
+        'well_id': np.repeat([f'W{i:02d}' for i in range(n)], months),
+        'date': (first[:, None] + np.arange(months)).ravel().astype('datetime64[ns]'),
+        'rate': rate,
+        'lateral_length': np.repeat(rng.uniform(5000, 12000, n), months),
+        'operator': 'ACME',
+    })
+    return table.sample(frac=1, random_state=0)
+
+
+def test_rate_matrix_stream_matches_table(tmp_path):
+    table = _history()
+    path = tmp_path / 'history.csv'
+    table.to_csv(path, index=False)
+    wells, matrix = rate_matrix(table, lateral_col='lateral_length')
+    stream_wells, stream_matrix = rate_matrix_stream(str(path), lateral_col='lateral_length', chunksize=97)
+    assert list(wells) == list(stream_wells)
+    assert np.allclose(matrix, stream_matrix, equal_nan=True)
+
+
+def test_type_curve_from_file_object(tmp_path):
+    table = _history()
+    path = tmp_path / 'history.csv'
+    table.to_csv(path, index=False)
+    with open(path, 'rb') as f:
+        curve = type_curve(f, chunksize=100)
+    pd.testing.assert_frame_equal(curve, type_curve(table))
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from welltest import STORAGE_POINT, analyze_table, bourdet_derivative, storage_skin_model, wellbore_storage
+
+
+def _bourdet_loop(t, dp, L):
+    # Textbook Bourdet derivative: on each side the nearest point at least L
+    # away in ln t (the adjacent point when L = 0), slopes weighted by the
+    # opposite spacing; one-sided where a side has no such point
+    x = np.log(t)
+    out = np.empty(len(x))
+    for i in range(len(x)):
+        left = [j for j in range(i) if x[i] - x[j] >= L]
+        right = [k for k in range(i + 1, len(x)) if x[k] - x[i] >= L]
+        j = left[-1] if left else None
+        k = right[0] if right else None
+        if j is not None:
+            slope_left = (dp[i] - dp[j]) / (x[i] - x[j])
+        if k is not None:
+            slope_right = (dp[k] - dp[i]) / (x[k] - x[i])
+        if j is not None and k is not None:
+            dl, dr = x[i] - x[j], x[k] - x[i]
+            out[i] = (slope_left * dr + slope_right * dl) / (dl + dr)
+        else:
+            out[i] = slope_left if j is not None else slope_right
+    return out
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(19)
+    t = np.sort(rng.uniform(-3, 2, 300))
+    t = 10.0 ** t
+    dp = 40 * np.log(t) + 5 * np.sin(3 * np.log(t)) + 200 + rng.normal(0, 0.5, len(t))
+    return t, dp
+
+
+@pytest.mark.parametrize('smoothing', [0.0, 0.05, 0.1, 0.3])
+def test_bourdet_derivative_matches_loop(samples, smoothing):
+    t, dp = samples
+    np.testing.assert_allclose(bourdet_derivative(t, dp, smoothing), _bourdet_loop(t, dp, smoothing),
+                               rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize('smoothing', [0.0, 0.1, 0.5])
+def test_bourdet_derivative_of_radial_flow(samples, smoothing):
+    # dp = m ln t + c: the derivative is m everywhere, ends included
+    t, _ = samples
+    np.testing.assert_allclose(bourdet_derivative(t, 35.0 * np.log(t) + 120.0, smoothing), 35.0, rtol=1e-9)
+
+
+def test_bourdet_derivative_of_storage():
+    # Pure wellbore storage dp = C t: d dp / d ln t = C t, to second order
+    # in the log spacing for the three-point weighted formula
+    t = np.logspace(-3, 0, 301)
+    derivative = bourdet_derivative(t, 80 * t, 0.0)
+    np.testing.assert_allclose(derivative[1:-1], 80 * t[1:-1], rtol=1e-4)
+
+
+ROCK = {'q': 500.0, 'Bo': 1.3, 'vis': 0.5, 'h': 50.0, 'phi': 0.2, 'ct': 1.6e-5, 'rw': 0.35}
+
+
+def test_analyze_table_on_semilog_line():
+    # Pure IARF: del_p = m (log t + log(k/(phi vis ct rw^2)) - 3.23 + S/1.151)
+    # with m = 162.6 q vis Bo / (k h), and the derivative m / ln 10
+    k, skin = 20.0, 2.0
+    m = 162.6 * ROCK['q'] * ROCK['vis'] * ROCK['Bo'] / (k * ROCK['h'])
+    t = np.logspace(-1, 2, 61)
+    diffusivity = k / (ROCK['phi'] * ROCK['vis'] * ROCK['ct'] * ROCK['rw'] ** 2)
+    del_p = m * (np.log10(t) + np.log10(diffusivity) - 3.23 + skin / 1.151)
+    table = pd.DataFrame({'t (hours)': t, 'del_p': del_p, 'ddp/dlnt': np.full_like(t, m / np.log(10))})
+
+    result = analyze_table(table, **ROCK)
+    assert result['semilog_slope'] == pytest.approx(m, rel=1e-12)
+    assert result['k_semilog'] == pytest.approx(k, rel=1e-12)
+    assert result['skin_semilog'] == pytest.approx(skin, rel=1e-12)
+    # 70.6 in the derivative formula rounds 162.6 / ln 10 = 70.62
+    assert result['k'] == pytest.approx(k, rel=1e-3)
+    assert result['skin'] == pytest.approx(skin, abs=5e-3)
+    assert result['iarf_start'] == t[0] and result['iarf_end'] == t[-1]
+    assert result['Cs'] == wellbore_storage(ROCK['q'], ROCK['Bo'], t[STORAGE_POINT], del_p[STORAGE_POINT])
+
+
+def test_analyze_table_storage_and_skin_model():
+    # Storage, skin and radial flow from the Stehfest model: storage read on
+    # the unit-slope line, the type-curve match recovers k, C and skin
+    t = np.logspace(-4, 2, 121)
+    del_p, derivative = storage_skin_model(t, 20.0, 0.01, 2.0, **ROCK)
+    table = pd.DataFrame({'t (hours)': t, 'del_p': del_p, 'ddp/dlnt': derivative})
+    # Invalid rows are dropped before the storage point is taken
+    table = pd.concat([pd.DataFrame({'t (hours)': [0.0], 'del_p': [0.0], 'ddp/dlnt': [np.nan]}), table])
+
+    result = analyze_table(table, **ROCK, match=True)
+    assert result['Cs'] == pytest.approx(0.01, rel=2e-3)
+    assert result['k'] == pytest.approx(20.0, rel=0.02)
+    assert result['skin'] == pytest.approx(2.0, abs=0.15)
+    assert result['k_match'] == pytest.approx(20.0, rel=1e-6)
+    assert result['C_match'] == pytest.approx(0.01, rel=1e-6)
+    assert result['skin_match'] == pytest.approx(2.0, abs=1e-6)
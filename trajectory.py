@@ -0,0 +1,368 @@
+import numpy as np
+
+# Every profile in directional_drilling.py is a chain of sections in the
+# vertical plane in which the inclination changes linearly with MD: vertical
+# and tangent sections (constant inclination) and build/drop arcs (constant
+# build rate).  A profile is therefore fully described by its corner stations
+# (Start, Kick Off, End of Build, ..., Target) and any MD in between can be
+# evaluated in closed form from the station that starts its section.
+
+STATION_DTYPE = np.dtype([('md', 'f8'), ('tvd', 'f8'), ('h', 'f8'), ('inc', 'f8')])
+TRAJECTORY_DTYPE = STATION_DTYPE
+
+
+def radius_of_curvature(build_rate):
+    return 18000 / (np.pi * build_rate)
+
+
+def stations(md, tvd, h, inc):
+    st = np.empty(len(md), dtype=STATION_DTYPE)
+    st['md'] = md
+    st['tvd'] = tvd
+    st['h'] = h
+    st['inc'] = inc
+    return st
+
+
+def _section(st, i):
+    # Start station, signed build rate (deg/ft, negative while dropping) and
+    # signed radius of section i, which runs from station i to station i+1
+    md0, tvd0, h0, inc0 = st['md'][i], st['tvd'][i], st['h'][i], st['inc'][i]
+    dmd_section = st['md'][i + 1] - md0
+    dinc_section = st['inc'][i + 1] - inc0
+    curved = dinc_section != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(curved, dinc_section / dmd_section, 0.0)
+        r = np.where(curved, 180 / (np.pi * rate), 0.0)
+    return md0, tvd0, h0, inc0, rate, r, curved
+
+
+def evaluate(st, md):
+    md = np.asarray(md, dtype=float)
+    i = np.clip(np.searchsorted(st['md'], md, side='left') - 1, 0, len(st) - 2)
+    md0, tvd0, h0, inc0, rate, r, curved = _section(st, i)
+    dmd = md - md0
+    inc = inc0 + rate * dmd
+
+    i0 = np.radians(inc0)
+    ix = np.radians(inc)
+    out = np.empty(md.shape, dtype=TRAJECTORY_DTYPE)
+    out['md'] = md
+    out['inc'] = inc
+    out['tvd'] = tvd0 + np.where(curved, r * (np.sin(ix) - np.sin(i0)), dmd * np.cos(i0))
+    out['h'] = h0 + np.where(curved, r * (np.cos(i0) - np.cos(ix)), dmd * np.sin(i0))
+    return out
+
+
+def md_at_tvd(st, tvd):
+    # First MD at which the profile reaches each TVD.  TVD never decreases
+    # along these profiles, so the section is found by binary search on the
+    # station TVDs and the MD inside it by inverting the tangent or arc
+    # equation.  TVDs outside the profile give NaN.
+    tvd = np.asarray(tvd, dtype=float)
+    i = np.clip(np.searchsorted(st['tvd'], tvd, side='left') - 1, 0, len(st) - 2)
+    md0, tvd0, _, inc0, rate, r, curved = _section(st, i)
+    dtvd = tvd - tvd0
+
+    i0 = np.radians(inc0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ix = np.degrees(np.arcsin(np.clip(np.sin(i0) + dtvd / r, -1, 1)))
+        md = md0 + np.where(curved, (ix - inc0) / rate, np.where(dtvd > 0, dtvd / np.cos(i0), 0.0))
+    inside = (tvd >= st['tvd'][0]) & (tvd <= st['tvd'][-1])
+    return np.where(inside, md, np.nan)
+
+
+class Trajectory:
+    # Analytic point lookups on a planned profile, e.g.
+    #     well = Trajectory(build_hold(1000, 10000, 6000, 1.5)['stations'])
+    #     well.at_md([2500, 9000])['tvd']
+    #     well.md_at_tvd(casing_tvds)
+    # All queries are vectorized over arrays of depths.
+
+    def __init__(self, st):
+        self.stations = st
+
+    @property
+    def total_md(self):
+        return self.stations['md'][-1]
+
+    def at_md(self, md):
+        md = np.asarray(md, dtype=float)
+        out = evaluate(self.stations, md)
+        outside = (md < 0) | (md > self.total_md)
+        for name in ('tvd', 'h', 'inc'):
+            out[name] = np.where(outside, np.nan, out[name])
+        return out
+
+    def md_at_tvd(self, tvd):
+        return md_at_tvd(self.stations, tvd)
+
+    def at_tvd(self, tvd):
+        return self.at_md(self.md_at_tvd(tvd))
+
+
+def md_grid(st):
+    MDt = st['md'][-1]
+    return np.linspace(0, MDt, round(MDt))
+
+
+def adaptive_md(st, tol=0.1, max_points=2000):
+    # MD samples that keep the chord error of every arc below tol (ft).  Each
+    # station is an exact breakpoint, straight sections need no interior
+    # points and an arc of radius r is split into steps of at most
+    # 2*arccos(1 - tol/r).  If the result would exceed max_points, the arc
+    # samples are scaled down proportionally (stations are always kept).
+    md0 = st['md'][:-1]
+    dmd = np.diff(st['md'])
+    dinc = np.radians(np.abs(np.diff(st['inc'])))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.where(dinc > 0, dmd / dinc, np.inf)
+        step = 2 * np.arccos(np.clip(1 - tol / r, -1, 1))
+        n = np.where((dinc > 0) & (dmd > 0), np.ceil(dinc / step), 1).astype(int)
+
+    budget = max_points - len(st)
+    extra = n - 1
+    if extra.sum() > budget:
+        extra = np.floor(extra * max(budget, 0) / extra.sum()).astype(int)
+    n = extra + 1
+
+    section = np.repeat(np.arange(len(n)), n)
+    k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    md = md0[section] + dmd[section] * k / n[section]
+    return np.unique(np.append(md, st['md'][-1]))
+
+
+def _broadcast(*args):
+    return np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in args))
+
+
+def build_hold_points(Vb, Vt, Ht, build_rate):
+    # Key points of many Build and Hold candidates at once.  All inputs are
+    # broadcast against each other; geometries that cannot reach the target
+    # (EOB below the target, arcsin out of range, zero build rate ...) are
+    # returned as NaN with feasible=False instead of raising warnings.
+    Vb, Vt, Ht, build_rate = _broadcast(Vb, Vt, Ht, build_rate)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = radius_of_curvature(build_rate)
+        X = np.arctan((Ht - r)/(Vt - Vb))
+        Y = np.arcsin((r*np.cos(X))/(Vt - Vb))
+        a = np.degrees(X) + np.degrees(Y)
+
+        Vc = Vb + r*np.sin(np.radians(a))
+        Hc = r*(1-np.cos(np.radians(a)))
+        MDc = Vb + (a/build_rate)*100
+        MDt = MDc + (Vt - Vc)/np.cos(np.radians(a))
+
+    feasible = ((build_rate > 0) & (Vt > Vb) & (Vb >= 0) & (a > 0) & (a < 90)
+                & (Vc <= Vt) & np.isfinite(MDt))
+    points = {'r': r, 'a': a, 'Vc': Vc, 'Hc': Hc, 'MDc': MDc, 'MDt': MDt}
+    for key in points:
+        points[key] = np.where(feasible, points[key], np.nan)
+    points['feasible'] = feasible
+    return points
+
+
+def build_hold_drop_points(Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2):
+    # Key points of many Build, Hold and Drop (S-shape) candidates at once,
+    # flagged the same way as build_hold_points.
+    Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2 = _broadcast(
+        Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r1 = radius_of_curvature(build_rate_1)
+        r2 = radius_of_curvature(build_rate_2)
+        OQ = Ht - r1 - r2*np.cos(np.radians(a2)) - (Vt - Ve)*np.tan(np.radians(a2))
+        OP = Ve - Vb + r2*np.sin(np.radians(a2))
+        QS = r1+r2
+        PQ = np.sqrt(OP**2 + OQ**2)
+        PS = np.sqrt(PQ**2 - QS**2)
+        X = np.arctan(OQ/OP)
+        Y = np.arctan(QS/PS)
+        a1 = np.degrees(X) + np.degrees(Y)
+        CD = PS
+
+        Vc = Vb + r1*np.sin(np.radians(a1))
+        Hc = r1*(1-np.cos(np.radians(a1)))
+        MDc = Vb + (a1/build_rate_1)*100
+        Vd = Vc + CD*np.cos(np.radians(a1))
+        Hd = Hc + CD*np.sin(np.radians(a1))
+        MDd = MDc + CD
+        He = Hd + r2*(np.cos(np.radians(a2)) - np.cos(np.radians(a1)))
+        MDe = MDd + (a1 - a2)*100/build_rate_2
+        MDt = MDe + (Vt - Ve)/np.cos(np.radians(a2))
+
+    feasible = ((build_rate_1 > 0) & (build_rate_2 > 0) & (Vb >= 0) & (Ve > Vb) & (Vt >= Ve)
+                & (a2 >= 0) & (a1 > a2) & (a1 < 90) & (Vd <= Ve) & np.isfinite(MDt))
+    points = {'r1': r1, 'r2': r2, 'a1': a1, 'Vc': Vc, 'Hc': Hc, 'MDc': MDc,
+              'Vd': Vd, 'Hd': Hd, 'MDd': MDd, 'He': He, 'MDe': MDe, 'MDt': MDt}
+    for key in points:
+        points[key] = np.where(feasible, points[key], np.nan)
+    points['feasible'] = feasible
+    return points
+
+
+def build_hold(Vb, Vt, Ht, build_rate):
+    p = build_hold_points(Vb, Vt, Ht, build_rate)
+    a, Vc, Hc, MDc, MDt = (float(p[k]) for k in ('a', 'Vc', 'Hc', 'MDc', 'MDt'))
+    return {
+        'r': float(p['r']),
+        'a': a,
+        'feasible': bool(p['feasible']),
+        'stations': stations([0, Vb, MDc, MDt], [0, Vb, Vc, Vt], [0, 0, Hc, Ht], [0, 0, a, a]),
+    }
+
+
+def build_hold_drop(Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2):
+    p = build_hold_drop_points(Vb, Vt, Ht, Ve, build_rate_1, build_rate_2, a2)
+    a1, Vc, Hc, MDc, Vd, Hd, MDd, He, MDe, MDt = (
+        float(p[k]) for k in ('a1', 'Vc', 'Hc', 'MDc', 'Vd', 'Hd', 'MDd', 'He', 'MDe', 'MDt'))
+    return {
+        'r1': float(p['r1']),
+        'r2': float(p['r2']),
+        'a1': a1,
+        'feasible': bool(p['feasible']),
+        'stations': stations([0, Vb, MDc, MDd, MDe, MDt], [0, Vb, Vc, Vd, Ve, Vt],
+                             [0, 0, Hc, Hd, He, Ht], [0, 0, a1, a1, a2, a2]),
+    }
+
+
+def slanted_points(MDb, Vt, Ht, a1, build_rate):
+    # Key points of many Slanted candidates at once (a1 is the inclination
+    # at the surface), flagged the same way as build_hold_points: the build
+    # must turn towards the target (a2 > 0), stay below horizontal and end
+    # above the target.
+    MDb, Vt, Ht, a1, build_rate = _broadcast(MDb, Vt, Ht, a1, build_rate)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r1 = radius_of_curvature(build_rate)
+        NT = Ht - Vt*np.tan(np.radians(a1))
+        QT = NT *np.cos(np.radians(a1))
+        NQ = NT *np.sin(np.radians(a1))
+        AN = Vt/(np.cos(np.radians(a1)))
+        AQ = AN + NQ
+        X = np.arctan((QT - r1)/(AQ - MDb))
+        Y = np.arcsin((r1*np.cos(X))/(AQ - MDb))
+        a2 = np.degrees(X) + np.degrees(Y)
+        at = a1 + a2
+        CM = r1*(1-np.cos(np.radians(a2)))/(np.cos(np.radians(a1)))
+        AD = MDb + r1*np.sin(np.radians(a2))
+        DM = r1*(1- np.cos(np.radians(a2)))*np.tan(np.radians(a1))
+        AM = AD - DM
+
+        Vb = MDb*np.cos(np.radians(a1))
+        Hb = MDb*np.sin(np.radians(a1))
+        Vc = AM*np.cos(np.radians(a1))
+        Hc = AM*np.sin(np.radians(a1)) + CM
+        MDc = MDb + a2*100/build_rate
+        MDt = MDc + (Vt-Vc)/np.cos(np.radians(at))
+
+    feasible = ((build_rate > 0) & (MDb >= 0) & (a1 >= 0) & (a1 < 90) & (a2 > 0) & (at < 90)
+                & (Vc <= Vt) & np.isfinite(MDt))
+    points = {'r1': r1, 'a2': a2, 'at': at, 'Vb': Vb, 'Hb': Hb, 'Vc': Vc, 'Hc': Hc, 'MDc': MDc, 'MDt': MDt}
+    for key in points:
+        points[key] = np.where(feasible, points[key], np.nan)
+    points['feasible'] = feasible
+    return points
+
+
+def slanted(MDb, Vt, Ht, a1, build_rate):
+    p = slanted_points(MDb, Vt, Ht, a1, build_rate)
+    a2, at, Vb, Hb, Vc, Hc, MDc, MDt = (float(p[k]) for k in ('a2', 'at', 'Vb', 'Hb', 'Vc', 'Hc', 'MDc', 'MDt'))
+    return {
+        'r1': float(p['r1']),
+        'a2': a2,
+        'at': at,
+        'feasible': bool(p['feasible']),
+        'stations': stations([0, MDb, MDc, MDt], [0, Vb, Vc, Vt], [0, Hb, Hc, Ht], [a1, a1, at, at]),
+    }
+
+
+def horizontal_single_points(Vt, Ht, L):
+    # Key points of many Horizontal Single Buildup candidates at once.  The
+    # radius is Ht - L, so the kick-off Vt - r must lie at or below surface
+    # and the radius must be positive.
+    Vt, Ht, L = _broadcast(Vt, Ht, L)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = Ht - L
+        build_rate = 18000/(r*np.pi)
+        Vb = Vt - r
+        MDc = Vb + 90*100/build_rate
+        MDt = MDc + L
+
+    feasible = (r > 0) & (Vb >= 0) & (L >= 0) & np.isfinite(MDt)
+    points = {'r': r, 'build_rate': build_rate, 'Vb': Vb, 'MDc': MDc, 'MDt': MDt}
+    for key in points:
+        points[key] = np.where(feasible, points[key], np.nan)
+    points['feasible'] = feasible
+    return points
+
+
+def horizontal_single(Vt, Ht, L):
+    p = horizontal_single_points(Vt, Ht, L)
+    r, Vb, MDc, MDt = (float(p[k]) for k in ('r', 'Vb', 'MDc', 'MDt'))
+    return {
+        'r': r,
+        'build_rate': float(p['build_rate']),
+        'feasible': bool(p['feasible']),
+        'stations': stations([0, Vb, MDc, MDt], [0, Vb, Vt, Vt], [0, 0, r, Ht], [0, 0, 90, 90]),
+    }
+
+
+def horizontal_double_points(Vb, Vt, Ht, L, a1, build_rate_1):
+    # The tangent length CD and second radius r2 follow from the 2x2 linear
+    # system
+    #     Vt - Vc     = CD*cos(a1) + r2*(1 - sin(a1))
+    #     Ht - Hc - L = CD*sin(a1) + r2*cos(a1)
+    # whose determinant is 1 - sin(a1), solved by Cramer's rule for every
+    # candidate at once.  A first build to horizontal or beyond (a1 >= 90;
+    # a1 = 90 makes the system singular), a negative tangent or a
+    # non-positive r2 is flagged as infeasible.
+    Vb, Vt, Ht, L, a1, build_rate_1 = _broadcast(Vb, Vt, Ht, L, a1, build_rate_1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r1 = radius_of_curvature(build_rate_1)
+        a2 = 90-a1
+        sin_a1 = np.sin(np.radians(a1))
+        cos_a1 = np.cos(np.radians(a1))
+        Vc = Vb + r1*sin_a1
+        Hc = r1*(1-cos_a1)
+        MDc = Vb + (a1/build_rate_1)*100
+        He = Ht - L
+
+        dV = Vt - Vc
+        dH = He - Hc
+        det = 1 - sin_a1
+        singular = np.abs(det) < 1e-12
+        det = np.where(singular, np.nan, det)
+        CD = (dV*cos_a1 - (1 - sin_a1)*dH)/det
+        r2 = (cos_a1*dH - sin_a1*dV)/det
+
+        build_rate_2 = 18000/(np.pi*r2)
+        Hd = Hc + CD*sin_a1
+        Vd = Vc + CD*cos_a1
+        MDd = MDc + CD
+        MDe = MDd + a2*100/build_rate_2
+        MDt = MDe + L
+
+    feasible = ((build_rate_1 > 0) & (Vb >= 0) & (L >= 0) & (a1 > 0) & (a1 < 90) & ~singular
+                & (CD >= 0) & (r2 > 0) & np.isfinite(MDt))
+    points = {'r1': r1, 'r2': r2, 'a2': a2, 'build_rate_2': build_rate_2,
+              'Vc': Vc, 'Hc': Hc, 'MDc': MDc, 'CD': CD, 'Vd': Vd, 'Hd': Hd, 'MDd': MDd,
+              'He': He, 'MDe': MDe, 'MDt': MDt}
+    for key in points:
+        points[key] = np.where(feasible, points[key], np.nan)
+    points['feasible'] = feasible
+    return points
+
+
+def horizontal_double(Vb, Vt, Ht, L, a1, build_rate_1):
+    p = horizontal_double_points(Vb, Vt, Ht, L, a1, build_rate_1)
+    Vc, Hc, MDc, Vd, Hd, MDd, He, MDe, MDt = (
+        float(p[k]) for k in ('Vc', 'Hc', 'MDc', 'Vd', 'Hd', 'MDd', 'He', 'MDe', 'MDt'))
+    return {
+        'r1': float(p['r1']),
+        'r2': float(p['r2']),
+        'a2': float(p['a2']),
+        'build_rate_2': float(p['build_rate_2']),
+        'feasible': bool(p['feasible']),
+        'stations': stations([0, Vb, MDc, MDd, MDe, MDt], [0, Vb, Vc, Vd, Vt, Vt],
+                             [0, 0, Hc, Hd, He, Ht], [0, 0, a1, a1, 90, 90]),
+    }
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from decline import fit_well_stream
+from production import iter_chunks
+
+# Type curves from the production history of many wells.  Every well is
+# aligned to its first month with a positive rate, optionally normalized to a
+# reference lateral length, and averaged into time bins.  The binned rates
+# form one (wells x bins) matrix, built with a single bincount, so the
+# percentiles per bin are a single nanpercentile call instead of a loop over
+# wells.  P10 is the high case (exceeded by 10 % of the wells).
+
+MONTHS_PER_YEAR = 12
+
+
+def _months(values):
+    # Months since an arbitrary origin: calendar months for dates, so that
+    # monthly records fall in whole months, and years * 12 for numeric time
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float) * MONTHS_PER_YEAR
+    dates = pd.to_datetime(values)
+    return (dates.dt.year * MONTHS_PER_YEAR + dates.dt.month - 1
+            + (dates.dt.day - 1) / dates.dt.days_in_month).to_numpy(dtype=float)
+
+
+def _rates(table, well_col, time_col, rate_col, lateral_col, reference_lateral):
+    # (well ids, months, rates) of the producing records of a table
+    q = table[rate_col].to_numpy(dtype=float)
+    if lateral_col is not None:
+        q = q * reference_lateral / table[lateral_col].to_numpy(dtype=float)
+    producing = q > 0
+    return table[well_col].to_numpy()[producing], _months(table[time_col])[producing], q[producing]
+
+
+def _bin_sums(code, elapsed, q, n_wells, n_bins, bin_months):
+    # Flat (wells x bins) sums and counts of the rates
+    keep = elapsed >= 0
+    bins = np.floor(elapsed[keep] / bin_months + 1e-9).astype(int)
+    flat = code[keep] * n_bins + bins
+    size = n_wells * n_bins
+    return np.bincount(flat, weights=q[keep], minlength=size), np.bincount(flat, minlength=size)
+
+
+def _matrix(total, count, n_wells, n_bins):
+    with np.errstate(invalid='ignore'):
+        return (total / count).reshape(n_wells, n_bins)
+
+
+def rate_matrix(table, well_col='well_id', time_col='date', rate_col='rate', lateral_col=None,
+                reference_lateral=10_000.0, bin_months=1):
+    # (wells, matrix) with the mean rate of every well in every bin of
+    # bin_months months since its first production; NaN where a well has no
+    # record (yet).  With lateral_col, rates are scaled to reference_lateral.
+    ids, months, q = _rates(table, well_col, time_col, rate_col, lateral_col, reference_lateral)
+    wells, code = np.unique(ids, return_inverse=True)
+    first = np.full(len(wells), np.inf)
+    np.minimum.at(first, code, months)
+    elapsed = months - first[code]
+
+    n_bins = int(np.floor(elapsed.max() / bin_months + 1e-9)) + 1 if len(elapsed) else 0
+    total, count = _bin_sums(code, elapsed, q, len(wells), n_bins, bin_months)
+    return wells, _matrix(total, count, len(wells), n_bins)
+
+
+def rate_matrix_stream(source, well_col='well_id', time_col='date', rate_col='rate', lateral_col=None,
+                       reference_lateral=10_000.0, bin_months=1, chunksize=500_000):
+    # Same from a CSV or Parquet file (path or seekable file object) read in
+    # chunks of the needed columns only.  The first pass finds the first and
+    # last producing month of every well, the second adds the rates into the
+    # bins, so memory is one chunk plus the (wells x bins) matrix.  Rows do
+    # not need to be sorted.
+    columns = [well_col, time_col, rate_col] + ([lateral_col] if lateral_col is not None else [])
+
+    def chunks():
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        for chunk in iter_chunks(source, chunksize, columns):
+            yield _rates(chunk, well_col, time_col, rate_col, lateral_col, reference_lateral)
+
+    spans = [pd.DataFrame({'well': ids, 'month': months}).groupby('well')['month'].agg(['min', 'max'])
+             for ids, months, _ in chunks()]
+    spans = pd.concat(spans).groupby(level=0).agg({'min': 'min', 'max': 'max'})
+    if spans.empty:
+        return np.array([]), np.empty((0, 0))
+    wells = pd.Index(spans.index)
+    first = spans['min'].to_numpy()
+    n_bins = int(np.floor((spans['max'] - spans['min']).max() / bin_months + 1e-9)) + 1
+
+    total = np.zeros(len(wells) * n_bins)
+    count = np.zeros(len(wells) * n_bins, dtype=int)
+    for ids, months, q in chunks():
+        code = wells.get_indexer(ids)
+        chunk_total, chunk_count = _bin_sums(code, months - first[code], q, len(wells), n_bins, bin_months)
+        total += chunk_total
+        count += chunk_count
+    return wells.to_numpy(), _matrix(total, count, len(wells), n_bins)
+
+
+def type_curve(table, well_col='well_id', time_col='date', rate_col='rate', lateral_col=None,
+               reference_lateral=10_000.0, bin_months=1, min_wells=1, chunksize=500_000):
+    # One row per time bin: month and time (years) since first production,
+    # the number of wells contributing, the P10/P50/P90 and mean rate.
+    # Bins with fewer than min_wells wells are dropped.  table is a
+    # DataFrame, or a CSV/Parquet file that is streamed (rate_matrix_stream).
+    if isinstance(table, pd.DataFrame):
+        _, matrix = rate_matrix(table, well_col, time_col, rate_col, lateral_col, reference_lateral, bin_months)
+    else:
+        _, matrix = rate_matrix_stream(table, well_col, time_col, rate_col, lateral_col, reference_lateral,
+                                       bin_months, chunksize)
+    wells = np.sum(np.isfinite(matrix), axis=0)
+    matrix = matrix[:, wells >= min_wells]
+    month = np.flatnonzero(wells >= min_wells) * bin_months
+    p10, p50, p90 = np.nanpercentile(matrix, [90, 50, 10], axis=0)
+    return pd.DataFrame({
+        'month': month,
+        'time': month / MONTHS_PER_YEAR,
+        'wells': wells[wells >= min_wells],
+        'P10': p10,
+        'P50': p50,
+        'P90': p90,
+        'mean': np.nanmean(matrix, axis=0),
+    })
+
+
+def fit_type_curve(curve, levels=('P10', 'P50', 'P90')):
+    # Fits the decline models to each type curve level, one row per level
+    # and model (curve, model, qi, di, b, r2, best)
+    t = curve['time'].to_numpy(dtype=float)
+    series = ((level, t, curve[level].to_numpy(dtype=float)) for level in levels)
+    params = fit_well_stream(series, workers=1)
+    return params.rename(columns={'well_id': 'curve'})
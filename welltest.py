@@ -0,0 +1,425 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from glob import glob
+from math import factorial
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.optimize import least_squares
+from scipy.special import k0e, k1e
+
+# Pressure-transient (well test) analysis of buildup and drawdown tests.
+#
+# Raw gauge data (often hundreds of thousands of samples at 1 s) is first
+# averaged onto a logarithmic time grid, then differentiated with the Bourdet
+# algorithm: the derivative at a point is the distance-weighted mean of the
+# slopes to the nearest points at least L (in ln t) to its left and right.
+# Neighbours are found with searchsorted, so the whole curve is a handful of
+# array operations.
+#
+# Field units throughout: q in STB/D, viscosity in cp, h and rw in ft, ct in
+# 1/psi, t in hours, pressures in psi, k in md.
+#
+# Infinite-acting radial flow (IARF) shows as a flat pressure derivative on
+# the log-log plot.  The plateau detector slides a window of points along the
+# derivative and, for all windows at once, fits the slope of ln(derivative)
+# against ln(t) and takes the coefficient of variation of the derivative.
+# Points covered by a window that is flat (small slope) and quiet (small
+# scatter) are IARF candidates; the candidate run spanning the most log
+# cycles is the IARF window.
+
+
+def iarf_plateau(t, derivative, window=5, slope_tol=0.03, cv_tol=0.02):
+    # Returns a dict with the stabilization value (mean derivative over the
+    # plateau), start/stop (slice of the input arrays), t_start/t_end,
+    # log_cycles, slope, cv and a confidence between 0 and 1: the plateau
+    # length in log cycles (capped at 1) times a flatness factor that is 1
+    # for a perfectly flat, noise-free derivative and 0.5 when the slope or
+    # scatter of the whole plateau reaches its tolerance.
+    t = np.asarray(t, dtype=float)
+    derivative = np.asarray(derivative, dtype=float)
+    valid = np.flatnonzero(np.isfinite(t) & np.isfinite(derivative) & (t > 0) & (derivative > 0))
+    if len(valid) < window:
+        raise ValueError(f'At least {window} valid derivative points are needed to find the IARF plateau')
+    x = np.log(t[valid])
+    y = np.log(derivative[valid])
+
+    xw = sliding_window_view(x, window)
+    yw = sliding_window_view(y, window)
+    dx = xw - xw.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.sum(dx * (yw - yw.mean(axis=1, keepdims=True)), axis=1) / np.sum(dx * dx, axis=1)
+    dw = sliding_window_view(derivative[valid], window)
+    cv = dw.std(axis=1) / dw.mean(axis=1)
+    flat = (np.abs(slope) < slope_tol) & (cv < cv_tol)
+
+    # Points covered by at least one flat window, split into runs
+    covered = np.convolve(flat, np.ones(window, dtype=int))[:len(x)] > 0
+    edges = np.diff(np.concatenate(([0], covered.astype(int), [0])))
+    starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        raise ValueError('No IARF plateau found; try a smaller window or larger tolerances')
+    span = x[stops - 1] - x[starts]
+    best = np.argmax(span)
+    a, b = starts[best], stops[best]
+
+    value = derivative[valid][a:b].mean()
+    run_slope = np.polyfit(x[a:b], y[a:b], 1)[0]
+    run_cv = derivative[valid][a:b].std() / value
+    log_cycles = span[best] / np.log(10)
+    flatness = max(0.0, 1 - 0.5 * max(abs(run_slope) / slope_tol, run_cv / cv_tol))
+    confidence = min(1.0, log_cycles) * flatness
+    return {
+        'value': value,
+        'start': valid[a],
+        'stop': valid[b - 1] + 1,
+        't_start': t[valid[a]],
+        't_end': t[valid[b - 1]],
+        'log_cycles': log_cycles,
+        'slope': run_slope,
+        'cv': run_cv,
+        'confidence': confidence,
+    }
+
+
+def log_resample(t, p, points_per_cycle=20):
+    # Averages (t, p) samples with t > 0 into bins of equal width in log10 t;
+    # t of a bin is the geometric mean of its samples.  Empty bins are dropped.
+    t = np.asarray(t, dtype=float)
+    p = np.asarray(p, dtype=float)
+    keep = np.isfinite(t) & np.isfinite(p) & (t > 0)
+    t, p = t[keep], p[keep]
+    log_t = np.log10(t)
+    bins = np.floor((log_t - log_t.min()) * points_per_cycle).astype(int)
+    count = np.bincount(bins)
+    filled = count > 0
+    count = count[filled]
+    t_bin = 10 ** (np.bincount(bins, weights=log_t)[filled] / count)
+    p_bin = np.bincount(bins, weights=p)[filled] / count
+    return t_bin, p_bin
+
+
+def bourdet_derivative(t, dp, smoothing=0.1):
+    # d(dp)/d(ln t) with the Bourdet smoothing window L = smoothing (in ln t;
+    # 0 gives the plain three-point derivative).  The first and last points
+    # use the one-sided slope.
+    x = np.log(np.asarray(t, dtype=float))
+    dp = np.asarray(dp, dtype=float)
+    n = len(x)
+    i = np.arange(n)
+    left = np.minimum(np.searchsorted(x, x - smoothing, side='right') - 1, i - 1)
+    right = np.maximum(np.searchsorted(x, x + smoothing, side='left'), i + 1)
+    has_left, has_right = left >= 0, right < n
+    left, right = np.clip(left, 0, n - 1), np.clip(right, 0, n - 1)
+
+    dx_left, dx_right = x - x[left], x[right] - x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope_left = (dp - dp[left]) / dx_left
+        slope_right = (dp[right] - dp) / dx_right
+        weighted = (slope_left * dx_right + slope_right * dx_left) / (dx_left + dx_right)
+    return np.where(has_left & has_right, weighted, np.where(has_left, slope_left, slope_right))
+
+
+def derivative_table(t, p, p0=None, smoothing=0.1, points_per_cycle=20):
+    # Log-log diagnostic table from raw gauge data (t in hours since the
+    # start of the flow period, p in psi) with the notebook's columns.
+    # del_p is |p - p0|, p0 defaulting to the first pressure: the initial
+    # pressure for a drawdown or the flowing pressure at shut-in for a
+    # buildup.
+    t = np.asarray(t, dtype=float)
+    p = np.asarray(p, dtype=float)
+    if p0 is None:
+        p0 = p[np.argmin(t)]
+    t_log, p_log = log_resample(t, p, points_per_cycle)
+    del_p = np.abs(p_log - p0)
+    return pd.DataFrame({
+        't (hours)': t_log,
+        'pwf (psi)': p_log,
+        'del_p': del_p,
+        'ddp/dlnt': bourdet_derivative(t_log, del_p, smoothing),
+    })
+
+
+# Interpretation formulas (field units)
+def wellbore_storage(q, Bo, t, del_p):
+    # Cs (bbl/psi) from a point on the early unit-slope line
+    return q * Bo / (24 * del_p / t)
+
+
+# Table row (after dropping invalid rows) the storage constant is read from:
+# the third, as in the IARF notebook
+STORAGE_POINT = 2
+
+
+def _storage(q, Bo, t, del_p):
+    i = min(STORAGE_POINT, len(t) - 1)
+    return wellbore_storage(q, Bo, t[i], del_p[i])
+
+
+def permeability_derivative(q, vis, Bo, h, stabilization):
+    # k (md) from the IARF stabilization of the derivative
+    return 70.6 * q * vis * Bo / (h * stabilization)
+
+
+def permeability_semilog(q, vis, Bo, h, slope):
+    # k (md) from the semi-log straight line slope (psi/log cycle)
+    return 162.6 * q * vis * Bo / (h * np.abs(slope))
+
+
+def skin_derivative(del_p_st, stabilization, t_st, k, phi, vis, ct, rw):
+    # Skin from a point (t_st, del_p_st) on the IARF plateau
+    return 1.151 * (del_p_st / (2.303 * stabilization) - np.log10(t_st)
+                    - np.log10(k / (phi * vis * ct * rw * rw)) + 3.23)
+
+
+def skin_semilog(del_p_1hr, slope, k, phi, vis, ct, rw):
+    # Skin from the pressure change at 1 hour on the semi-log straight line
+    return 1.151 * (del_p_1hr / np.abs(slope) - np.log10(k / (phi * vis * ct * rw * rw)) + 3.23)
+
+
+def analyze_table(table, q, Bo, vis, h, phi, ct, rw, match=False, **plateau):
+    # Interprets a derivative table ('t (hours)', 'del_p', 'ddp/dlnt', as in
+    # the notebook or from derivative_table): wellbore storage from the
+    # STORAGE_POINT row, the IARF window from iarf_plateau (keyword arguments are passed
+    # on), permeability and skin from both the derivative and the semi-log
+    # straight line fitted over that window.  With match, the type-curve
+    # match (match_storage_skin) started from these results is added.
+    table = table.dropna(subset=['t (hours)', 'del_p', 'ddp/dlnt'])
+    table = table[(table['t (hours)'] > 0) & (table['del_p'] > 0)]
+    t = table['t (hours)'].to_numpy(dtype=float)
+    del_p = table['del_p'].to_numpy(dtype=float)
+    iarf = iarf_plateau(t, table['ddp/dlnt'].to_numpy(dtype=float), **plateau)
+    window = slice(iarf['start'], iarf['stop'])
+
+    st = iarf['value']
+    k = permeability_derivative(q, vis, Bo, h, st)
+    t_st = np.mean(t[window])
+    del_p_st = np.interp(t_st, t[window], del_p[window])
+    # Semi-log line del_p = slope * log10(t) + del_p_1hr over the IARF window
+    slope, del_p_1hr = np.polyfit(np.log10(t[window]), del_p[window], 1)
+    k_semilog = permeability_semilog(q, vis, Bo, h, slope)
+    result = {
+        'Cs': _storage(q, Bo, t, del_p),
+        'stabilization': st,
+        'k': k,
+        'skin': skin_derivative(del_p_st, st, t_st, k, phi, vis, ct, rw),
+        'semilog_slope': slope,
+        'k_semilog': k_semilog,
+        'skin_semilog': skin_semilog(del_p_1hr, slope, k_semilog, phi, vis, ct, rw),
+        'iarf_start': iarf['t_start'],
+        'iarf_end': iarf['t_end'],
+        'iarf_log_cycles': iarf['log_cycles'],
+        'iarf_confidence': iarf['confidence'],
+    }
+    if match:
+        fit = match_storage_skin(t, del_p, table['ddp/dlnt'].to_numpy(dtype=float), q, Bo, vis, h, phi, ct, rw,
+                                 result['k'], result['Cs'], result['skin'])
+        result.update({'k_match': fit['k'], 'C_match': fit['C'], 'skin_match': fit['skin'], 'match_rms': fit['rms']})
+    return result
+
+
+def analyze_test(t, p, q, Bo, vis, h, phi, ct, rw, p0=None, smoothing=0.1, points_per_cycle=20, match=False,
+                 **plateau):
+    # Same from raw gauge data (see derivative_table)
+    table = derivative_table(t, p, p0, smoothing, points_per_cycle)
+    return analyze_table(table, q, Bo, vis, h, phi, ct, rw, match, **plateau)
+
+
+# Type-curve matching.  The model is a vertical well with wellbore storage
+# and skin in an infinite homogeneous reservoir; its dimensionless pressure
+# in Laplace space is
+#     pwD(s) = (K0(√s) + S√s K1(√s)) / (s (√s K1(√s) + CD s (K0(√s) + S√s K1(√s))))
+# and is inverted with the Stehfest algorithm.  The e^-√s factors of K0 and
+# K1 cancel, so the exponentially scaled k0e/k1e are used and large s does
+# not underflow.  All time points and parameter sets are evaluated in one
+# array of shape (parameter sets, times, Stehfest terms); the finite
+# difference Jacobian of the fit is a single such call.
+STEHFEST_N = 12
+
+
+@lru_cache(maxsize=None)
+def stehfest_weights(n=STEHFEST_N):
+    # Stehfest coefficients V_1..V_n (n even), computed once per n
+    half = n // 2
+    v = np.zeros(n)
+    for i in range(1, n + 1):
+        for k in range((i + 1) // 2, min(i, half) + 1):
+            v[i - 1] += (k ** half * factorial(2 * k)
+                         / (factorial(half - k) * factorial(k) * factorial(k - 1)
+                            * factorial(i - k) * factorial(2 * k - i)))
+        v[i - 1] *= (-1) ** (i + half)
+    v.setflags(write=False)
+    return v
+
+
+def _pwd_laplace(s, CD, S):
+    x = np.sqrt(s)
+    k0, xk1 = k0e(x), x * k1e(x)
+    num = k0 + S * xk1
+    return num / (s * (xk1 + CD * s * num))
+
+
+def radial_storage_skin(tD, CD, S, n=STEHFEST_N):
+    # Dimensionless pressure pwD and derivative dpwD/dln(tD) at tD, shape
+    # (times,) or (sets, times), for CD and S of shape () or (sets,)
+    v = stehfest_weights(n)
+    tD = np.asarray(tD, dtype=float)
+    s = np.log(2) / tD[..., None] * np.arange(1, n + 1)
+    f = _pwd_laplace(s, np.asarray(CD, dtype=float)[..., None, None], np.asarray(S, dtype=float)[..., None, None])
+    pwd = np.log(2) / tD * np.sum(v * f, axis=-1)
+    # t dp/dt is the inverse of s*pwD(s) times t
+    derivative = np.log(2) * np.sum(v * s * f, axis=-1)
+    return pwd, derivative
+
+
+def _dimensionless(k, C, q, Bo, vis, h, phi, ct, rw):
+    # (tD per hour, pD per psi, CD) for permeability k (md) and storage C (bbl/psi)
+    return (0.0002637 * k / (phi * vis * ct * rw * rw),
+            k * h / (141.2 * q * Bo * vis),
+            0.8936 * C / (phi * ct * h * rw * rw))
+
+
+def storage_skin_model(t, k, C, S, q, Bo, vis, h, phi, ct, rw, n=STEHFEST_N):
+    # del_p and its log derivative (psi) at t (hours); k, C and S may be
+    # arrays of parameter sets, giving results of shape (sets, times)
+    # Negative skin as an effective wellbore radius rw*e^-S with zero skin,
+    # where the Laplace solution stays positive
+    S = np.asarray(S, dtype=float)
+    rw = rw * np.exp(-np.minimum(S, 0))
+    td_per_hour, pd_per_psi, CD = _dimensionless(np.asarray(k, dtype=float), C, q, Bo, vis, h, phi, ct, rw)
+    tD = np.asarray(td_per_hour)[..., None] * np.asarray(t, dtype=float)
+    pwd, derivative = radial_storage_skin(tD, CD, np.maximum(S, 0), n)
+    pd_per_psi = np.asarray(pd_per_psi)[..., None]
+    return pwd / pd_per_psi, derivative / pd_per_psi
+
+
+def match_storage_skin(t, del_p, derivative, q, Bo, vis, h, phi, ct, rw, k0=None, C0=None, S0=None):
+    # Fits k (md), C (bbl/psi) and skin together to the whole log-log
+    # pressure change and derivative, minimizing the log residuals of both.
+    # The starting point defaults to the straight-line results of
+    # analyze_table.  Returns k, C, CD, skin, rms (of the log residuals),
+    # success and the matched del_p and derivative curves.
+    t = np.asarray(t, dtype=float)
+    del_p = np.asarray(del_p, dtype=float)
+    derivative = np.asarray(derivative, dtype=float)
+    keep = np.isfinite(t) & np.isfinite(del_p) & np.isfinite(derivative) & (t > 0) & (del_p > 0) & (derivative > 0)
+    t, del_p, derivative = t[keep], del_p[keep], derivative[keep]
+    if None in (k0, C0, S0):
+        table = pd.DataFrame({'t (hours)': t, 'del_p': del_p, 'ddp/dlnt': derivative})
+        try:
+            start = analyze_table(table, q, Bo, vis, h, phi, ct, rw)
+            guess = start['k'], start['Cs'], start['skin']
+        except ValueError:
+            guess = (permeability_derivative(q, vis, Bo, h, derivative[-1]),
+                     _storage(q, Bo, t, del_p), 0.0)
+        k0 = guess[0] if k0 is None else k0
+        C0 = guess[1] if C0 is None else C0
+        S0 = guess[2] if S0 is None else S0
+    observed = np.log(np.concatenate((del_p, derivative)))
+    fluid = (q, Bo, vis, h, phi, ct, rw)
+
+    def curves(x):
+        # x rows: (ln k, ln C, S)
+        x = np.atleast_2d(x)
+        p, d = storage_skin_model(t, np.exp(x[:, 0]), np.exp(x[:, 1]), x[:, 2], *fluid)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log(np.concatenate((p, d), axis=1)) - observed
+
+    def residuals(x):
+        return curves(x)[0]
+
+    def jacobian(x):
+        step = 1e-6 * np.maximum(1, np.abs(x))
+        r = curves(np.vstack((x, x + np.diag(step))))
+        return ((r[1:] - r[0]) / step[:, None]).T
+
+    x0 = np.array([np.log(k0), np.log(C0), np.clip(S0, -7.9, 49)])
+    with np.errstate(all='ignore'):
+        result = least_squares(residuals, x0, jac=jacobian, bounds=([-np.inf, -np.inf, -8], [np.inf, np.inf, 50]))
+    k, C, S = np.exp(result.x[0]), np.exp(result.x[1]), result.x[2]
+    model_p, model_d = storage_skin_model(t, k, C, S, *fluid)
+    return {
+        'k': k,
+        'C': C,
+        'CD': _dimensionless(k, C, *fluid)[2],
+        'skin': S,
+        'rms': np.sqrt(np.mean(result.fun ** 2)),
+        'success': result.success and np.all(np.isfinite(result.fun)),
+        't (hours)': t,
+        'del_p': model_p,
+        'ddp/dlnt': model_d,
+    }
+
+
+# Batch interpretation of many tests.  Each test is a CSV (or Excel) file
+# with either the derivative columns of the notebook ('t (hours)', 'del_p',
+# 'ddp/dlnt') or raw gauge data ('t (hours)', 'pwf (psi)').  The rock and
+# fluid data come from a parameter table with one row per test (column
+# 'test' = file name without extension, plus q, Bo, vis, h, phi, ct, rw and
+# optionally p0).  Every test gets the straight-line and the type-curve
+# interpretation.  Tests run in a process pool; a test that cannot be
+# interpreted gets its error message in the summary instead of stopping
+# the batch.
+PARAMETERS = ['q', 'Bo', 'vis', 'h', 'phi', 'ct', 'rw']
+
+
+def read_test(path):
+    if str(path).lower().endswith(('.xlsx', '.xls')):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def _analyze_file(args):
+    path, params = args
+    row = {'test': os.path.splitext(os.path.basename(path))[0]}
+    try:
+        table = read_test(path)
+        values = [params[name] for name in PARAMETERS]
+        if {'del_p', 'ddp/dlnt'} <= set(table.columns):
+            row.update(analyze_table(table, *values, match=True))
+        else:
+            p0 = params.get('p0')
+            p0 = None if p0 is None or pd.isna(p0) else p0
+            row.update(analyze_test(table['t (hours)'], table['pwf (psi)'], *values, p0=p0, match=True))
+        row['error'] = None
+    except (KeyError, ValueError, TypeError, np.linalg.LinAlgError) as e:
+        row['error'] = f'{type(e).__name__}: {e}'
+    return row
+
+
+def run_batch(paths, parameters, workers=None):
+    # One summary row per test file; parameters is a DataFrame indexed by
+    # (or with a column) 'test'
+    if 'test' in parameters.columns:
+        parameters = parameters.set_index('test')
+    parameters = parameters.to_dict('index')
+    tasks = [(path, parameters.get(os.path.splitext(os.path.basename(path))[0], {})) for path in paths]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_analyze_file, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    else:
+        rows = [_analyze_file(task) for task in tasks]
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch interpretation of buildup/drawdown tests')
+    parser.add_argument('--tests', required=True, help='directory of test files (CSV or Excel)')
+    parser.add_argument('--parameters', required=True, help='CSV with test, q, Bo, vis, h, phi, ct, rw[, p0]')
+    parser.add_argument('--out', required=True, help='summary table (CSV)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    paths = sorted(p for ext in ('csv', 'xlsx', 'xls') for p in glob(os.path.join(args.tests, f'*.{ext}')))
+    summary = run_batch(paths, pd.read_csv(args.parameters), args.workers)
+    summary.to_csv(args.out, index=False)
+    print(f'{len(summary)} tests interpreted ({summary["error"].notna().sum()} failed), written to {args.out}')
+
+
+if __name__ == '__main__':
+    main()